@@ -0,0 +1,95 @@
+"""
+Compare one completion per comment against one batched completion per post, against
+the local stub chat-completions server.
+
+The stub answers batched prompts with the JSON the batched mode asks for, and takes
+longer for longer completions (BASE_LATENCY plus PER_REPLY_LATENCY per reply). Prompt
+tokens are the stub's whitespace word counts, so compare them relative to each other.
+
+Usage:
+    python -m benchmarks.bench_batched_generation
+"""
+import json
+import time
+
+import generate_responses
+from llm_backends import Router, GroqBackend
+from benchmarks.stub_llm_server import start_stub_server
+
+POSTS = 5
+COMMENTS_PER_POST = 8
+BASE_LATENCY = 0.2
+PER_REPLY_LATENCY = 0.05
+
+
+def listed_comments(prompt):
+    """Return the comments listed in a batched prompt, or None for a per-comment prompt."""
+    if "Comments:" not in prompt:
+        return None
+    listed = prompt.split("Comments:", 1)[1].split("You are responding", 1)[0]
+    return json.loads(listed)
+
+
+def reply(prompt):
+    comments = listed_comments(prompt)
+    if comments is None:
+        return prompt.split("Comment:")[1].split("Commentor:")[0].strip()
+    return json.dumps({"replies": [{"id": c["id"], "response": c["comment"]} for c in comments]})
+
+
+def latency(body):
+    comments = listed_comments(body.get("messages", [{}])[-1].get("content", ""))
+    return BASE_LATENCY + PER_REPLY_LATENCY * (len(comments) if comments else 1)
+
+
+def run():
+    server = start_stub_server(latency=latency, reply=reply)
+    generate_responses.llm = Router([GroqBackend(api_key="stub", base_url=server.url, max_retries=0)])
+
+    comments = [
+        {
+            "Post URL": f"https://www.linkedin.com/feed/update/urn:li:activity:{p}/",
+            "Post Content": f"Synthetic post {p} about shipping a new release to production.",
+            "Comment Text": f"Comment number {c} on post {p}",
+            "Commenter Name": f"Commenter {c}",
+        }
+        for p in range(POSTS) for c in range(COMMENTS_PER_POST)
+    ]
+    expected = [c["Comment Text"] for c in comments]
+    footer = "\n" + generate_responses.RESPONSE_FOOTER
+
+    modes = (
+        ("per comment", lambda: generate_responses.generate_responses_concurrently(comments)),
+        ("batched", lambda: generate_responses.generate_responses_batched(comments)),
+    )
+    try:
+        print(f"{len(comments)} comments across {POSTS} posts, {generate_responses.MAX_CONCURRENT_REQUESTS} requests in flight")
+        print(f"{'mode':>12} {'requests':>9} {'prompt tokens':>14} {'wall s':>8}")
+        results = {}
+        for name, generate in modes:
+            generate_responses.take_llm_usage()
+            started = time.perf_counter()
+            responses = generate()
+            wall = time.perf_counter() - started
+            usage = generate_responses.take_llm_usage()
+
+            # The stub echoes each comment back, so mix-ups between comments are visible
+            assert [r.replace(footer, "") for r in responses] == expected, "responses do not match their comments"
+            results[name] = (usage["Prompt Tokens"], wall)
+            print(f"{name:>12} {usage['Requests']:>9} {usage['Prompt Tokens']:>14} {wall:>8.2f}")
+
+        (single_tokens, single_wall), (batch_tokens, batch_wall) = results["per comment"], results["batched"]
+        print(f"saved: {single_tokens - batch_tokens} prompt tokens ({1 - batch_tokens / single_tokens:.0%}), "
+              f"{single_wall - batch_wall:.2f}s ({1 - batch_wall / single_wall:.0%})")
+
+        # Unparseable batched output falls back to one request per comment
+        server.reply = lambda prompt: "Sure! Here are the replies." if "Comments:" in prompt else reply(prompt)
+        responses = generate_responses.generate_responses_batched(comments[:COMMENTS_PER_POST])
+        assert responses == expected[:COMMENTS_PER_POST], "fallback did not answer every comment"
+        print("fallback on unparseable output: ok")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run()
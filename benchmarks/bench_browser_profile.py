@@ -0,0 +1,159 @@
+"""
+Compare page load time and Chrome memory with and without the lean browsing profile.
+
+A local server hosts a fixture post page: a post with COMMENTS synthetic comments,
+images, web fonts, a video, and tracker scripts. Trackers are served under paths
+named after their real hosts (e.g. /www.google-analytics.com/analytics.js), so the
+profile's BLOCKED_URL_PATTERNS match them as they would on LinkedIn. Every asset
+takes ASSET_LATENCY seconds and is never cached.
+
+Each profile loads the page PAGES times in a fresh headless Chrome. The benchmark
+reports load times from Navigation Timing, the requests the server actually served,
+and the RSS of Chrome's process tree afterwards (read from /proc, so Linux only).
+Needs Chrome and chromedriver.
+
+Usage:
+    python -m benchmarks.bench_browser_profile
+"""
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import session_manager
+from benchmarks.fakes import build_post_page_html
+
+PAGES = 10
+COMMENTS = 100
+IMAGES = 40
+FONTS = 4
+ASSET_LATENCY = 0.05
+
+# Asset payload sizes in bytes, by path prefix
+ASSET_SIZES = {"/img/": 60_000, "/fonts/": 120_000, "/media/": 2_000_000}
+TRACKER_PATHS = [
+    "/www.google-analytics.com/analytics.js",
+    "/www.googletagmanager.com/gtm.js",
+    "/px.ads.linkedin.com/collect.js",
+]
+
+
+def build_fixture_page():
+    fonts = "".join(
+        f"@font-face {{ font-family: f{i}; src: url('/fonts/f{i}.woff2'); }} .f{i} {{ font-family: f{i}; }}"
+        for i in range(FONTS)
+    )
+    assets = (
+        f"<style>{fonts}</style>"
+        + "".join(f'<p class="f{i}">font {i}</p>' for i in range(FONTS))
+        + "".join(f'<img src="/img/{i}.jpg" width="64" height="64">' for i in range(IMAGES))
+        + '<video src="/media/clip.mp4" preload="auto" autoplay muted></video>'
+        + "".join(f'<script src="{path}"></script>' for path in TRACKER_PATHS)
+    )
+    return build_post_page_html(COMMENTS).replace("<body>", f"<body>{assets}", 1)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        path = self.path.split("?", 1)[0]
+        kind = "page" if path == "/post" else path.split("/")[1]
+        with server.lock:
+            server.served[kind] = server.served.get(kind, 0) + 1
+
+        if path == "/post":
+            data, content_type = server.page, "text/html"
+        else:
+            time.sleep(ASSET_LATENCY)
+            size = next((size for prefix, size in ASSET_SIZES.items() if path.startswith(prefix)), 200)
+            data = b"0" * size if not path.endswith(".js") else b"void 0;"
+            content_type = "application/javascript" if path.endswith(".js") else "application/octet-stream"
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.served = {}
+    server.page = build_fixture_page().encode("utf-8")
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/post"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def process_tree_rss_mb(root_pid):
+    """Summed VmRSS of a process and all its descendants, in MB."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as file:
+                # The command name may contain spaces; the parent PID follows its closing parenthesis
+                parent = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    total_kb, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def measure(server, lean):
+    driver = session_manager.create_driver(headless=True, profile_dir=None, lean=lean)
+    try:
+        with server.lock:
+            server.served.clear()
+        loads = []
+        for i in range(PAGES):
+            driver.get(f"{server.url}?load={i}")
+            # driver.get returns after the load event, so loadEventEnd is set
+            loads.append(driver.execute_script(
+                "const t = performance.timing; return t.loadEventEnd - t.navigationStart;"
+            ))
+        rss = process_tree_rss_mb(driver.service.process.pid)
+        with server.lock:
+            served = dict(server.served)
+    finally:
+        driver.quit()
+    return loads, served, rss
+
+
+def run():
+    server = start_fixture_server()
+    try:
+        print(f"{'profile':>8} {'p50 ms':>8} {'p95 ms':>8} {'requests/page':>14} {'Chrome RSS MB':>14}  served")
+        for name, lean in (("full", False), ("lean", True)):
+            loads, served, rss = measure(server, lean)
+            loads.sort()
+            p95 = loads[min(len(loads) - 1, int(0.95 * len(loads)))]
+            per_page = sum(served.values()) / PAGES
+            detail = ", ".join(f"{kind} {count}" for kind, count in sorted(served.items()))
+            print(f"{name:>8} {statistics.median(loads):>8.0f} {p95:>8.0f} {per_page:>14.1f} {rss:>14.1f}  {detail}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,98 @@
+"""
+Check the comment API decoder against a recorded-format fixture and compare its
+speed with parsing the rendered page.
+
+The fixture (benchmarks/fixtures/comment_api_responses.json) holds one post's comment
+API exchange in LinkedIn's normalized Voyager JSON format. It includes paging, a
+replies response, an edited comment, a malformed entity and unrelated requests. It is
+replayed through a fake performance log, and the decoded tree is checked against the
+fixture's "expected" section.
+
+The speed comparison decodes synthetic API responses and parses the equivalent page
+with post_parser. Both must return the same ids and texts.
+
+Usage:
+    python -m benchmarks.bench_comment_api
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import comment_api
+import post_parser
+from benchmarks.fakes import FakeApiDriver, build_comment_api_responses, build_post_page_html
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "comment_api_responses.json")
+
+SIZES = [10, 100, 1000]
+REPLIES_PER_COMMENT = 2
+REPEAT = 3
+
+
+def check_fixture():
+    with open(FIXTURE_PATH, "r", encoding="utf-8") as file:
+        fixture = json.load(file)
+    expected = fixture["expected"]
+
+    # End to end: performance log events, then response bodies through CDP
+    driver = FakeApiDriver(fixture["responses"])
+    comment_api.start_capture(driver)
+    driver.get(f"https://www.linkedin.com/feed/update/{fixture['post_urn']}/")
+    captured = comment_api.read_comments(driver)
+    assert captured["responses"] == 3, captured
+    assert captured["unreadable"] == 0, captured
+
+    # Time labels against the time the fixture was recorded
+    result = comment_api.parse_comment_responses(
+        [response["body"] for response in fixture["responses"] if comment_api.is_comment_response(response["url"])],
+        reference=datetime.fromisoformat(fixture["reference"])
+    )
+    for tree in (captured, result):
+        assert [c["id"] for c in tree["comments"]] == [c["id"] for c in expected["comments"]], tree
+        assert tree["errors"] == expected["errors"], tree["errors"]
+        for comment, want in zip(tree["comments"], expected["comments"]):
+            assert [reply["id"] for reply in comment["replies"]] == want["replies"], comment
+            if "text" in want:
+                assert comment["text"] == want["text"], comment
+    assert [c["time"] for c in result["comments"]] == [c["time"] for c in expected["comments"]]
+    print(f"fixture: {len(result['comments'])} comments, "
+          f"{sum(len(c['replies']) for c in result['comments'])} replies, {result['errors']} skipped - ok")
+
+
+def flatten(tree):
+    return sorted(
+        (entry["id"], entry["text"])
+        for comment in tree["comments"] for entry in [comment] + comment["replies"]
+    )
+
+
+def best_time(function):
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run():
+    check_fixture()
+
+    print(f"{'comments':>9} {'api ms':>9} {'page ms':>9} {'speed-up':>9}")
+    for size in SIZES:
+        # Bodies arrive as JSON text from Network.getResponseBody, so decoding is timed too
+        bodies = [json.dumps(response["body"]) for response in build_comment_api_responses(size, REPLIES_PER_COMMENT)]
+        html = build_post_page_html(size, REPLIES_PER_COMMENT)
+
+        api_seconds, api_tree = best_time(lambda: comment_api.parse_comment_responses([json.loads(b) for b in bodies]))
+        page_seconds, page_tree = best_time(lambda: post_parser.parse_post_page(html))
+        assert flatten(api_tree) == flatten(page_tree), "API and page comments differ"
+
+        total = size * (1 + REPLIES_PER_COMMENT)
+        print(f"{total:>9} {api_seconds * 1000:>9.1f} {page_seconds * 1000:>9.1f} {page_seconds / api_seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run()
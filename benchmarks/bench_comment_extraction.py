@@ -0,0 +1,44 @@
+"""
+Compare chromedriver round trips of parse_comments and the single-script extractor.
+
+Usage:
+    python -m benchmarks.bench_comment_extraction
+"""
+import time
+
+from fetch_comments import parse_comments, extract_comments, EXTRACT_COMMENTS_SCRIPT
+from benchmarks.fakes import FakeDriver, build_comment_section, snapshot_comment_section
+
+SIZES = [10, 100, 300, 1000]
+REPLIES_PER_COMMENT = 2
+
+
+class ExtractorDriver(FakeDriver):
+    def script_result(self, script, *args):
+        if script == EXTRACT_COMMENTS_SCRIPT:
+            return snapshot_comment_section(args[0])
+        return None
+
+
+def run():
+    print(f"{'comments':>10} {'parse_comments RTs':>20} {'extract_comments RTs':>22} {'parse s':>9} {'extract s':>10}")
+    for size in SIZES:
+        driver = ExtractorDriver()
+        section = build_comment_section(driver, size, REPLIES_PER_COMMENT)
+
+        started = time.perf_counter()
+        legacy = parse_comments(section)
+        legacy_seconds = time.perf_counter() - started
+        legacy_round_trips = driver.round_trips
+
+        driver.round_trips = 0
+        started = time.perf_counter()
+        extracted = extract_comments(driver, section)
+        extract_seconds = time.perf_counter() - started
+
+        assert extracted == legacy, "extract_comments output differs from parse_comments"
+        print(f"{size:>10} {legacy_round_trips:>20} {driver.round_trips:>22} {legacy_seconds:>9.3f} {extract_seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,51 @@
+"""
+Measure fetch_posts_parallel speed-up against local fixture pages.
+
+Each fake worker browser "loads" a post by waiting PAGE_LOAD_SECONDS (the browser
+is a separate process, so this time does not hold the GIL) and then parses a fixture
+page with post_parser, like PARSE_MODE = "source" does.
+
+Usage:
+    python -m benchmarks.bench_fetch_pool
+"""
+import os
+import time
+
+from fetch_comments import fetch_posts_parallel
+from post_parser import parse_post_page
+from benchmarks.fakes import FakeDriver, build_post_page_html
+
+POSTS = 48
+PAGE_LOAD_SECONDS = 0.2
+COMMENTS_PER_POST = 20
+
+
+def run():
+    page_html = build_post_page_html(COMMENTS_PER_POST)
+
+    def fetch(driver, urn):
+        driver.get(urn)
+        time.sleep(PAGE_LOAD_SECONDS)
+        return {"Post URL": urn, "Comments": parse_post_page(page_html)["comments"]}
+
+    urns = [f"urn:li:activity:{i}" for i in range(POSTS)]
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores})
+
+    baseline = None
+    print(f"{'workers':>8} {'wall s':>8} {'posts/s':>8} {'speed-up':>9}")
+    for workers in worker_counts:
+        started = time.perf_counter()
+        results, stats = fetch_posts_parallel([FakeDriver() for _ in range(workers)], urns, fetch=fetch)
+        wall = time.perf_counter() - started
+
+        assert [urn for urn, _ in results] == urns, "results are not in input order"
+        assert all(post is not None for _, post in results)
+        assert sum(worker["Posts"] for worker in stats) == POSTS
+
+        baseline = baseline or wall
+        print(f"{workers:>8} {wall:>8.2f} {POSTS / wall:>8.1f} {baseline / wall:>8.2f}x")
+
+
+if __name__ == "__main__":
+    run()
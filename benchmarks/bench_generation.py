@@ -0,0 +1,47 @@
+"""
+Measure concurrent response generation against the local stub chat-completions server.
+
+Usage:
+    python -m benchmarks.bench_generation
+"""
+import time
+
+import generate_responses
+from llm_backends import Router, GroqBackend
+from benchmarks.stub_llm_server import start_stub_server
+
+COMMENTS = 24
+LATENCY_SECONDS = 0.3
+CONCURRENCY = [1, 2, 4, 8]
+
+
+def run():
+    server = start_stub_server(latency=LATENCY_SECONDS, reply=lambda prompt: prompt.split("Comment:")[1].split("Commentor:")[0].strip())
+    generate_responses.llm = Router([GroqBackend(api_key="stub", base_url=server.url, max_retries=0)])
+
+    comments = [
+        {"Post Content": "Synthetic post", "Comment Text": f"Comment number {i}", "Commenter Name": f"Commenter {i}"}
+        for i in range(COMMENTS)
+    ]
+
+    try:
+        baseline = None
+        print(f"{'K':>4} {'wall s':>8} {'max in flight':>14} {'speed-up':>9}")
+        for k in CONCURRENCY:
+            server.max_in_flight = 0
+            started = time.perf_counter()
+            responses = generate_responses.generate_responses_concurrently(comments, max_concurrent=k)
+            wall = time.perf_counter() - started
+
+            # The stub echoes the comment back, so order mix-ups are visible
+            assert responses == [c["Comment Text"] for c in comments], "responses are out of order"
+            assert server.max_in_flight <= k, "more requests in flight than allowed"
+
+            baseline = baseline or wall
+            print(f"{k:>4} {wall:>8.2f} {server.max_in_flight:>14} {baseline / wall:>8.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+"""
+Run the generation stage offline through the backend router.
+
+Four backends serve the same comments: a hung one that always times out, a slow and a
+fast local stub, and an OpenAI-compatible endpoint (the stub server) that fails every
+third request. The router should settle on the fastest healthy backend, and every
+comment should still be answered.
+
+Usage:
+    python -m benchmarks.bench_llm_routing
+"""
+import time
+
+import generate_responses
+from llm_backends import Router, StubBackend, OpenAICompatibleBackend
+from benchmarks.stub_llm_server import start_stub_server
+from benchmarks.bench_batched_generation import reply
+
+POSTS = 10
+COMMENTS_PER_POST = 4
+TIMEOUT = 0.5
+
+
+def run():
+    failures = {"count": 0}
+
+    def flaky_reply(prompt):
+        failures["count"] += 1
+        if failures["count"] % 3 == 0:
+            raise ConnectionError("stub failure")
+        return reply(prompt)
+
+    server = start_stub_server(latency=0.03, reply=flaky_reply)
+    router = Router([
+        StubBackend("hung", latency=TIMEOUT * 4),
+        StubBackend("slow", latency=0.25),
+        StubBackend("fast", latency=0.05),
+        OpenAICompatibleBackend(f"{server.url}/v1", model="stub", name="openai-compatible"),
+    ], timeout=TIMEOUT)
+    generate_responses.llm = router
+
+    comments = [
+        {
+            "Post URL": f"https://www.linkedin.com/feed/update/urn:li:activity:{p}/",
+            "Post Content": f"Synthetic post {p}",
+            "Comment Text": f"Comment number {c} on post {p}",
+            "Commenter Name": f"Commenter {c}",
+        }
+        for p in range(POSTS) for c in range(COMMENTS_PER_POST)
+    ]
+
+    try:
+        for name, generate in (
+            ("per comment", generate_responses.generate_responses_concurrently),
+            ("batched", generate_responses.generate_responses_batched),
+        ):
+            started = time.perf_counter()
+            responses = generate(comments)
+            wall = time.perf_counter() - started
+            assert all(responses), "a comment was left without a response"
+            print(f"{name}: {len(comments)} comments answered in {wall:.2f}s")
+        print(router.report())
+        print("next request order:", ", ".join(backend.name for backend in router.ranked()))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run()
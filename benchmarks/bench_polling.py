@@ -0,0 +1,125 @@
+"""
+Simulate a day of polling to compare the old fixed 2-minute cycle with the adaptive
+scheduler.
+
+The simulated account has a few viral posts, some fresh ones, and a growing number of
+old, quiet posts. Comments arrive as Poisson processes. The fixed schedule opens every
+post each cycle. The adaptive schedule polls each post when scheduler.next_poll says
+so, within the page budget. For each schedule the benchmark reports page loads per
+hour and the delay from a comment arriving to its fetch.
+
+Usage:
+    python -m benchmarks.bench_polling
+"""
+import random
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import scheduler
+from timestamps import to_utc_iso
+
+HOURS = 24
+FIXED_INTERVAL = timedelta(minutes=2)
+
+# (posts, comments per hour, age in hours at the start)
+VIRAL = (3, 30.0, 2)
+FRESH = (10, 2.0, 6)
+QUIET_RATE = 0.02
+QUIET_COUNTS = [100, 1000]
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+SEED = 7
+
+
+def build_posts(quiet, rng):
+    posts = []
+    for count, rate, age in (VIRAL, FRESH, (quiet, QUIET_RATE, 24 * 30)):
+        for _ in range(count):
+            arrivals, t = [], 0.0
+            while True:
+                t += rng.expovariate(rate)
+                if t >= HOURS:
+                    break
+                arrivals.append(START + timedelta(hours=t))
+            posts.append({"rate": rate, "posted_at": START - timedelta(hours=age), "arrivals": arrivals})
+    return posts
+
+
+def detection_delays(post, checked_from, checked_at):
+    return [(checked_at - t).total_seconds() for t in post["arrivals"] if checked_from < t <= checked_at]
+
+
+def summarize(name, loads, delays, unfetched):
+    delays.sort()
+    p50 = delays[len(delays) // 2] / 60 if delays else 0.0
+    p95 = delays[int(0.95 * len(delays))] / 60 if delays else 0.0
+    print(f"{name:>28} {loads / HOURS:>12.1f} {p50:>9.1f} {p95:>9.1f} {unfetched:>10}")
+
+
+def run_fixed(posts):
+    loads, delays = 0, []
+    last = [START] * len(posts)
+    now = START
+    while now < START + timedelta(hours=HOURS):
+        now += FIXED_INTERVAL
+        for i, post in enumerate(posts):
+            delays += detection_delays(post, last[i], now)
+            last[i] = now
+            loads += 1
+    return loads, delays
+
+
+def run_adaptive(posts):
+    """Polls with scheduler.next_poll, in steady state: old posts start backed off."""
+    end = START + timedelta(hours=HOURS)
+    rows, last = [], []
+    rng = random.Random(SEED)
+    for post in posts:
+        quiet = post["rate"] == QUIET_RATE
+        checked = START - timedelta(hours=rng.uniform(0, 24)) if quiet else START
+        interval = scheduler.MAX_POLL_INTERVAL.total_seconds() if quiet else scheduler.MIN_POLL_INTERVAL.total_seconds()
+        rows.append({
+            "index": len(rows), "last_checked": to_utc_iso(checked), "posted_at": to_utc_iso(post["posted_at"]),
+            "comment_rate": post["rate"] if quiet else None, "poll_interval": interval,
+            "next_poll_at": to_utc_iso(checked + timedelta(seconds=interval)),
+            "card_is_fresh": False, "card_comment_count": None, "fetched_comment_count": None,
+        })
+        last.append(max(checked, START))
+
+    loads, delays = 0, []
+    window = deque()
+    now = START
+    while now < end:
+        while window and (now - window[0]) >= timedelta(hours=1):
+            window.popleft()
+        now_iso = to_utc_iso(now)
+        due = [row for row in rows if row["next_poll_at"] <= now_iso]
+        limit = max(0, scheduler.PAGES_PER_HOUR - len(window))
+        for row in scheduler.select_due_posts(due, limit, now):
+            i = row["index"]
+            found = detection_delays(posts[i], last[i], now)
+            delays += found
+            rate, interval, next_poll_at = scheduler.next_poll(row, len(found), now)
+            row.update(last_checked=to_utc_iso(now), comment_rate=rate, poll_interval=interval, next_poll_at=next_poll_at)
+            last[i] = now
+            loads += 1
+            window.append(now)
+
+        # Next cycle when the earliest post is due, at least MIN_CYCLE_GAP later
+        earliest = min(datetime.fromisoformat(row["next_poll_at"]) for row in rows)
+        now = max(earliest, now + scheduler.MIN_CYCLE_GAP)
+    return loads, delays
+
+
+def run():
+    print(f"{'schedule':>28} {'pages/hour':>12} {'p50 min':>9} {'p95 min':>9} {'unfetched':>10}")
+    for quiet in QUIET_COUNTS:
+        posts = build_posts(quiet, random.Random(SEED))
+        total = sum(len(post["arrivals"]) for post in posts)
+        for name, policy in (("fixed 2 min", run_fixed), ("adaptive", run_adaptive)):
+            loads, delays = policy(posts)
+            summarize(f"{name}, {len(posts)} posts", loads, delays, total - len(delays))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,40 @@
+"""
+Time offline page-source parsing of post pages with each available HTML parser.
+
+Usage:
+    python -m benchmarks.bench_post_parser
+"""
+import time
+
+import post_parser
+from benchmarks.fakes import FakeDriver, build_comment_section, build_post_page_html, snapshot_comment_section
+
+SIZES = [10, 100, 1000, 5000]
+REPLIES_PER_COMMENT = 2
+PARSERS = ["lxml", "html.parser"]
+
+
+def run():
+    print(f"{'comments':>10} {'page KB':>9} " + " ".join(f"{name + ' s':>14}" for name in PARSERS))
+    for size in SIZES:
+        html = build_post_page_html(size, REPLIES_PER_COMMENT)
+        expected = snapshot_comment_section(build_comment_section(FakeDriver(), size, REPLIES_PER_COMMENT))
+
+        timings = []
+        for parser in PARSERS:
+            post_parser.HTML_PARSER = parser
+            started = time.perf_counter()
+            try:
+                page = post_parser.parse_post_page(html)
+            except Exception:
+                timings.append(None)  # Parser not installed
+                continue
+            timings.append(time.perf_counter() - started)
+            assert page["comments"] == expected["comments"], f"{parser} output differs from the live extractor"
+
+        cells = " ".join(f"{t:>14.3f}" if t is not None else f"{'n/a':>14}" for t in timings)
+        print(f"{size:>10} {len(html) / 1024:>9.0f} {cells}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,77 @@
+"""
+Compare posting replies one page visit per reply against one visit per post.
+
+A fixture of 50 replies across 5 posts is posted to a FakePostDriver, whose page loads
+and "Load more comments" clicks cost real (simulated) time. Network-idle waits use a
+short idle window so the numbers are dominated by page loads and expansions.
+
+Usage:
+    python -m benchmarks.bench_reply_batching
+"""
+import functools
+import time
+
+import post_responses
+import waits
+from benchmarks.fakes import FakePostDriver
+
+POSTS = 5
+REPLIES_PER_POST = 10
+PAGE_LOAD_SECONDS = 0.3
+EXPAND_SECONDS = 0.2
+VISIBLE_COMMENTS = 3
+
+
+def build_fixture():
+    posts = {}
+    responses = []
+    for p in range(POSTS):
+        url = f"https://www.linkedin.com/feed/update/urn:li:activity:{p}/"
+        posts[url] = [f"urn:li:comment:(activity:{p},{c})" for c in range(REPLIES_PER_POST)]
+        for c, comment_id in enumerate(posts[url]):
+            responses.append({
+                "Post URL": url,
+                "Comment ID": comment_id,
+                "Comment Text": f"Comment {c} on post {p}",
+                "Commenter Name": f"Commenter {c}",
+                "AI Response": f"Thanks, Commenter {c}!"
+            })
+    # Interleave posts, as responses come out of the store in generation order
+    responses.sort(key=lambda response: response["Comment ID"].split(",")[1])
+    return posts, responses
+
+
+def per_reply(driver, responses):
+    for response in responses:
+        post_responses.reply_to_comment(
+            driver, response["Post URL"], response["Comment Text"], response["Commenter Name"],
+            response["AI Response"], comment_id=response["Comment ID"]
+        )
+
+
+def per_post(driver, responses):
+    for post_url, post_group in post_responses.group_by_post(responses).items():
+        for _ in post_responses.reply_on_post(driver, post_url, post_group):
+            pass
+
+
+def run():
+    post_responses.wait_for_network_idle = functools.partial(waits.wait_for_network_idle, idle=0.02, poll=0.01)
+    posts, responses = build_fixture()
+
+    print(f"{len(responses)} replies across {len(posts)} posts")
+    print(f"{'mode':>10} {'page loads':>11} {'wall s':>8} {'replies':>8}")
+    for name, post_all in (("per reply", per_reply), ("per post", per_post)):
+        driver = FakePostDriver(posts, visible=VISIBLE_COMMENTS,
+                                page_load_seconds=PAGE_LOAD_SECONDS, expand_seconds=EXPAND_SECONDS)
+        started = time.perf_counter()
+        post_all(driver, responses)
+        wall = time.perf_counter() - started
+
+        expected = sorted((response["Post URL"], response["Comment ID"]) for response in responses)
+        assert sorted(driver.submitted) == expected, "replies went to the wrong comments"
+        print(f"{name:>10} {driver.page_loads:>11} {wall:>8.2f} {len(driver.submitted):>8}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,108 @@
+"""
+Measure cold-start cost: import time per entry point and the wall time of no-op cycles.
+
+Each module is imported in a fresh interpreter with `python -X importtime`; the
+cumulative time of the module itself is reported (best of REPEAT runs) together with
+its heaviest imports. A no-op cycle is a generate and a post stage run against an
+empty store, where there is nothing to do and no browser is needed.
+
+Usage:
+    python -m benchmarks.bench_startup
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ENTRY_POINTS = ["main", "pipeline", "fetch_comments", "generate_responses", "post_responses", "session_manager"]
+
+# Fresh-interpreter runs per measurement; the fastest is reported
+REPEAT = 3
+
+# Heaviest imports listed per entry point
+TOP_IMPORTS = 3
+
+# A no-op cycle, in a fresh interpreter, from the first import to the stages returning
+NOOP_CYCLE = """
+import time
+started = time.perf_counter()
+import contextlib, io
+import storage, generate_responses, post_responses
+with contextlib.redirect_stdout(io.StringIO()):
+    generate_responses.main()
+    post_responses.main()
+storage.close_connection()
+print(time.perf_counter() - started)
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(args, cwd):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, check=True, cwd=cwd, env=env)
+
+
+def parse_importtime(stderr):
+    """Return (module, nesting depth, cumulative microseconds) from `-X importtime` output, in order."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            microseconds = int(cumulative)
+        except ValueError:
+            continue  # The header line
+        # One leading space, then two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, microseconds))
+    return entries
+
+
+def direct_imports(entries, module):
+    """Cumulative time of `module` and of the modules it imports directly."""
+    index = next(i for i, (name, depth, _) in enumerate(entries) if name == module and depth == 0)
+    children = []
+    # Nested imports are listed before the module that imports them
+    for name, depth, microseconds in reversed(entries[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, microseconds))
+    return entries[index][2], children
+
+
+def measure_import(module, cwd):
+    """Best cumulative import time of `module` in seconds, and its heaviest direct imports."""
+    best = None
+    for _ in range(REPEAT):
+        total, children = direct_imports(parse_importtime(run_python(["-X", "importtime", "-c", f"import {module}"], cwd).stderr), module)
+        if best is None or total < best[0]:
+            best = (total, children)
+    total, children = best
+    return total / 1e6, sorted(children, key=lambda item: -item[1])[:TOP_IMPORTS]
+
+
+def run():
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"{'entry point':>20} {'import ms':>10}  heaviest imports")
+        for module in ENTRY_POINTS:
+            seconds, heaviest = measure_import(module, work_dir)
+            imports = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in heaviest)
+            print(f"{module:>20} {seconds * 1000:>10.1f}  {imports}")
+
+        walls = []
+        for _ in range(REPEAT):
+            # Empty store each time, so both stages find nothing to do
+            cycle_dir = tempfile.mkdtemp(dir=work_dir)
+            started = time.perf_counter()
+            inner = float(run_python(["-c", NOOP_CYCLE], cycle_dir).stdout.strip().splitlines()[-1])
+            walls.append((time.perf_counter() - started, inner))
+        process, inner = min(walls)
+        print(f"\nno-op generate + post cycle: {inner:.3f}s after interpreter start, {process:.3f}s including it")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,363 @@
+"""
+In-memory stand-ins for Selenium's WebDriver and WebElement.
+
+Every method that would be an HTTP request to chromedriver increments the driver's
+`round_trips` counter, so benchmarks can compare how chatty different code paths are
+without starting a browser.
+"""
+import base64
+import json
+import time
+from datetime import timedelta
+
+from selenium.common.exceptions import NoSuchElementException
+
+import fetch_comments
+from timestamps import utc_now
+
+
+class FakeElement:
+    def __init__(self, driver, classes=(), text="", attributes=None, children=None):
+        self._driver = driver
+        self.classes = set(classes)
+        self._text = text
+        self.attributes = attributes or {}
+        self.children = children or []
+
+    def _descendants(self):
+        for child in self.children:
+            yield child
+            yield from child._descendants()
+
+    def _matching(self, by, value):
+        if by != "class name":
+            raise ValueError(f"FakeElement only supports class name lookups, got {by!r}")
+        return [element for element in self._descendants() if value in element.classes]
+
+    def find_elements(self, by, value):
+        self._driver.round_trips += 1
+        return self._matching(by, value)
+
+    def find_element(self, by, value):
+        self._driver.round_trips += 1
+        matches = self._matching(by, value)
+        if not matches:
+            raise NoSuchElementException(f"No element with class {value}")
+        return matches[0]
+
+    def get_attribute(self, name):
+        self._driver.round_trips += 1
+        return self.attributes.get(name)
+
+    @property
+    def text(self):
+        self._driver.round_trips += 1
+        return self._text + "".join(child._text for child in self._descendants())
+
+
+class FakeDriver:
+    def __init__(self):
+        self.round_trips = 0
+        self.page_loads = 0
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.round_trips += 1
+        self.scripts.append(script)
+        return self.script_result(script, *args)
+
+    def script_result(self, script, *args):
+        """Override to emulate what an injected script returns."""
+        return None
+
+    def get(self, url):
+        self.round_trips += 1
+        self.page_loads += 1
+
+    def quit(self):
+        pass
+
+
+
+class FakeControl:
+    """
+    A comment, button or text box on a FakePostDriver page. Clicking it runs
+    `on_click`; `find(value)` returns the control found inside it for a locator.
+    """
+    def __init__(self, driver, on_click=None, find=None):
+        self._driver = driver
+        self._on_click = on_click
+        self._find = find
+
+    def find_element(self, by, value):
+        self._driver.round_trips += 1
+        return self._find(value) if self._find else FakeControl(self._driver)
+
+    def is_displayed(self):
+        self._driver.round_trips += 1
+        return True
+
+    def is_enabled(self):
+        self._driver.round_trips += 1
+        return True
+
+    def click(self):
+        self._driver.round_trips += 1
+        if self._on_click:
+            self._on_click()
+
+    def send_keys(self, *keys):
+        self._driver.round_trips += 1
+
+
+class FakePostDriver(FakeDriver):
+    """
+    Emulates the post pages post_responses works on.
+
+    `posts` maps a post URL to its comment ids. Only the first `visible` comments are
+    on a freshly loaded page; the rest appear once EXPAND_COMMENTS_SCRIPT runs.
+    Loading a page and expanding it sleep for the given seconds, and every submitted
+    reply is recorded in `submitted` as (post URL, comment id).
+
+    Clicking a comment's Reply button opens a reply box in its thread, which stays open
+    for the rest of the visit. A box or submit button looked up from the whole page is
+    the first one opened, as in document order on LinkedIn; looked up from a comment's
+    thread, it is that thread's own box.
+    """
+    def __init__(self, posts, visible=3, page_load_seconds=0.0, expand_seconds=0.0):
+        super().__init__()
+        self.posts = posts
+        self.visible = visible
+        self.page_load_seconds = page_load_seconds
+        self.expand_seconds = expand_seconds
+        self.submitted = []
+        self._url = None
+        self._expanded = False
+        self._boxes = []
+
+    def get(self, url):
+        super().get(url)
+        time.sleep(self.page_load_seconds)
+        self._url = url
+        self._expanded = False
+        self._boxes = []
+
+    def _on_page(self, comment_id):
+        ids = self.posts.get(self._url, [])
+        shown = ids if self._expanded else ids[:self.visible]
+        return comment_id in shown
+
+    def _open_box(self, comment_id):
+        if comment_id not in self._boxes:
+            self._boxes.append(comment_id)
+
+    def _box_control(self, comment_id, value):
+        """The text box or submit button of the reply box opened under `comment_id`."""
+        if comment_id not in self._boxes:
+            raise NoSuchElementException(f"No reply box open under {comment_id}")
+        if "submit-button" in value:
+            return FakeControl(self, on_click=lambda: self.submitted.append((self._url, comment_id)))
+        return FakeControl(self)
+
+    def _comment(self, comment_id):
+        def find(value):
+            if "ancestor-or-self" in value:
+                return FakeControl(self, find=lambda inner: self._box_control(comment_id, inner))
+            if "Reply" in value:
+                return FakeControl(self, on_click=lambda: self._open_box(comment_id))
+            return FakeControl(self)
+        return FakeControl(self, find=find)
+
+    def find_element(self, by, value):
+        self.round_trips += 1
+        if "comment-box" in value:
+            if not self._boxes:
+                raise NoSuchElementException("No reply box open")
+            return self._box_control(self._boxes[0], value)
+        return FakeControl(self)
+
+    def find_elements(self, by, value):
+        self.round_trips += 1
+        if by == "css selector" and value.startswith('article[data-id="'):
+            comment_id = value[len('article[data-id="'):-2]
+            if self._on_page(comment_id):
+                return [self._comment(comment_id)]
+            return []
+        if value == "comments-comments-list":
+            return [FakeControl(self)]
+        return []
+
+    def execute_async_script(self, script, *args):
+        self.round_trips += 1
+        if script == fetch_comments.EXPAND_COMMENTS_SCRIPT:
+            loaded = 0
+            if not self._expanded:
+                time.sleep(self.expand_seconds)
+                self._expanded = True
+                loaded = max(len(self.posts.get(self._url, [])) - self.visible, 0)
+            comments = len(self.posts.get(self._url, []))
+            return {"rounds": int(loaded > 0), "clicks": int(loaded > 0), "loaded": loaded, "comments": comments,
+                    "expected": comments, "reason": "complete", "elapsed": 0}
+        return {"settled": True, "mutations": 0, "elapsed": 0}
+
+    def get_log(self, name):
+        self.round_trips += 1
+        return []
+
+
+def _entity(driver, data_id, name, text, time_commented, reply=False, replies=()):
+    """Build one comment article shaped like LinkedIn's markup."""
+    classes = ["comments-comment-entity"] + (["comments-comment-entity--reply"] if reply else [])
+    children = [
+        FakeElement(driver, ["comments-comment-meta__description-title"], name),
+        FakeElement(driver, ["comments-comment-meta__info"], children=[
+            FakeElement(driver, ["comments-comment-meta__data"], time_commented),
+        ]),
+        FakeElement(driver, ["comments-comment-item__main-content"], text),
+    ]
+    if replies:
+        children.append(FakeElement(driver, ["comments-replies-list"], children=list(replies)))
+    return FakeElement(driver, classes, attributes={"data-id": data_id}, children=children)
+
+
+def build_comment_section(driver, comment_count, replies_per_comment=2):
+    """Build a `comments-comments-list` with the given number of comments and replies."""
+    comments = []
+    for i in range(comment_count):
+        replies = [
+            _entity(driver, f"urn:li:comment:{i}-{j}", f"Replier {j}", f"Reply {j} to comment {i}", f"{j + 1}m", reply=True)
+            for j in range(replies_per_comment)
+        ]
+        comments.append(_entity(driver, f"urn:li:comment:{i}", f"Commenter {i}", f"Comment number {i}", f"{i % 59 + 1}m", replies=replies))
+    return FakeElement(driver, ["comments-comments-list"], children=comments)
+
+
+def snapshot_comment_section(section):
+    """Return what EXTRACT_COMMENTS_SCRIPT would return for a fake comments list."""
+    def read(element):
+        def first(root, cls):
+            return next(e for e in root._descendants() if cls in e.classes)
+        info = first(element, "comments-comment-meta__info")
+        return {
+            "id": element.attributes.get("data-id"),
+            "text": first(element, "comments-comment-item__main-content")._text,
+            "name": first(element, "comments-comment-meta__description-title")._text,
+            "time": first(info, "comments-comment-meta__data")._text,
+            "replies": [],
+        }
+
+    comments = []
+    for element in section.children:
+        comment = read(element)
+        for child in element.children:
+            if "comments-replies-list" in child.classes:
+                comment["replies"] = [read(reply) for reply in child.children]
+        comments.append(comment)
+    return {"comments": comments, "errors": 0}
+
+
+def _entity_html(data_id, name, text, time_commented, reply=False, replies_html=""):
+    classes = "comments-comment-entity" + (" comments-comment-entity--reply" if reply else "")
+    replies = f'<div class="comments-replies-list">{replies_html}</div>' if replies_html else ""
+    return (
+        f'<article class="{classes}" data-id="{data_id}">'
+        f'<span class="comments-comment-meta__description-title">{name}</span>'
+        f'<div class="comments-comment-meta__info"><time class="comments-comment-meta__data">{time_commented}</time></div>'
+        f'<span class="comments-comment-item__main-content"><span dir="ltr">{text}</span></span>'
+        f'{replies}</article>'
+    )
+
+
+def build_post_page_html(comment_count, replies_per_comment=2):
+    """Build a post page with the same comments as build_comment_section."""
+    comments = []
+    for i in range(comment_count):
+        replies = "".join(
+            _entity_html(f"urn:li:comment:{i}-{j}", f"Replier {j}", f"Reply {j} to comment {i}", f"{j + 1}m", reply=True)
+            for j in range(replies_per_comment)
+        )
+        comments.append(_entity_html(f"urn:li:comment:{i}", f"Commenter {i}", f"Comment number {i}", f"{i % 59 + 1}m", replies_html=replies))
+    return (
+        '<html><body><div class="scaffold-layout">'
+        '<div class="feed-shared-update-v2">'
+        '<span class="update-components-actor__title"><span>Post Author</span><span class="visually-hidden">Post Author</span></span>'
+        '<span class="update-components-actor__sub-description">5d • Edited</span>'
+        '<div class="feed-shared-update-v2__description"><span>Synthetic post content for benchmarking.</span></div>'
+        f'<div class="comments-comments-list">{"".join(comments)}</div>'
+        '</div></div></body></html>'
+    )
+
+
+def build_comment_api_responses(comment_count, replies_per_comment=2, reference=None, page_size=10):
+    """
+    Comment API responses (see comment_api.py) holding the same comments as
+    build_post_page_html, one page of `page_size` comments and their replies each.
+    Every entity is created `{i % 59 + 1}` (comments) or `{j + 1}` (replies) minutes
+    before `reference`, matching the page's time labels.
+    """
+    reference = reference or utc_now()
+    def entity(urn, name, text, minutes_ago, parent=None):
+        created = int((reference - timedelta(minutes=minutes_ago)).timestamp() * 1000)
+        data = {
+            "$type": "com.linkedin.voyager.dash.social.Comment",
+            "entityUrn": f"urn:li:fsd_comment:({urn})",
+            "urn": urn,
+            "commentary": {"text": text},
+            "commenter": {"title": {"text": name}},
+            "createdAt": created,
+        }
+        if parent:
+            data["*parentComment"] = f"urn:li:fsd_comment:({parent})"
+        return data
+
+    responses = []
+    for start in range(0, comment_count, page_size):
+        included = []
+        for i in range(start, min(start + page_size, comment_count)):
+            included.append(entity(f"urn:li:comment:{i}", f"Commenter {i}", f"Comment number {i}", i % 59 + 1))
+            for j in range(replies_per_comment):
+                included.append(entity(f"urn:li:comment:{i}-{j}", f"Replier {j}", f"Reply {j} to comment {i}", j + 1,
+                                       parent=f"urn:li:comment:{i}"))
+        responses.append({
+            "url": f"https://www.linkedin.com/voyager/api/graphql?variables=(start:{start})&queryId=voyagerSocialDashComments.1",
+            "body": {"data": {}, "included": included},
+        })
+    return responses
+
+
+class FakeApiDriver(FakeDriver):
+    """
+    Emulates the performance log and response bodies of a page that fetched `responses`
+    (dicts with "url", "body" and optionally "base64Encoded"), as in the comment API
+    fixtures. Opening a page queues the CDP Network events for every response.
+    """
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self._log = []
+
+    def get(self, url):
+        super().get(url)
+        for request_id, response in enumerate(self.responses):
+            for method, params in (
+                ("Network.requestWillBeSent", {"request": {"url": response["url"]}}),
+                ("Network.responseReceived", {"response": {"url": response["url"], "mimeType": "application/json"}}),
+                ("Network.loadingFinished", {}),
+            ):
+                message = {"method": method, "params": dict(params, requestId=str(request_id))}
+                self._log.append({"message": json.dumps({"message": message})})
+
+    def get_log(self, name):
+        self.round_trips += 1
+        entries, self._log = self._log, []
+        return entries
+
+    def execute_cdp_cmd(self, command, args):
+        self.round_trips += 1
+        if command != "Network.getResponseBody":
+            return {}
+        response = self.responses[int(args["requestId"])]
+        body = response["body"] if isinstance(response["body"], str) else json.dumps(response["body"])
+        if response.get("base64Encoded"):
+            return {"body": base64.b64encode(body.encode("utf-8")).decode("ascii"), "base64Encoded": True}
+        return {"body": body, "base64Encoded": False}
@@ -0,0 +1,82 @@
+"""
+Local stand-in for an OpenAI/Groq-style chat-completions endpoint.
+
+Answers every POST with a canned completion after LATENCY seconds and keeps track of
+how many requests were in flight at the same time. The latency may also be a function
+of the request body, to model longer completions taking longer, and a reply function
+that raises makes the request fail with HTTP 500.
+
+Usage:
+    server = start_stub_server(latency=0.3)
+    client = Groq(api_key="stub", base_url=server.url)
+    ...
+    server.shutdown()
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        status = 200
+        try:
+            time.sleep(server.latency(body) if callable(server.latency) else server.latency)
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+            payload = {
+                "id": f"stub-{server.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": server.reply(prompt)},
+                }],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 12, "total_tokens": prompt_tokens + 12},
+            }
+        except Exception as e:
+            # A reply function can raise to simulate a failing endpoint
+            status = 500
+            payload = {"error": {"message": str(e), "type": "server_error"}}
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def default_reply(prompt):
+    return "Thank you for your comment!\n+-------------------------------------+\n| This is an AI-generated response.   |\n+-------------------------------------+"
+
+
+def start_stub_server(latency=0.3, reply=default_reply, port=0):
+    """Start the stub server on a background thread and return it."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubChatHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.reply = reply
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,293 @@
+"""
+Stage-level benchmark suite.
+
+Runs the fetch, generate and post hot paths against synthetic posts (10 to 5,000
+comments with two replies each, plus a few comments with deep reply threads), using
+the fake WebDriver from benchmarks.fakes and the offline StubBackend instead of Groq.
+For every case it records the best wall time, operations per second, peak Python
+memory (tracemalloc) and WebDriver calls, and writes them to a JSON file so two
+versions can be compared.
+
+Usage:
+    python -m benchmarks.suite                      # writes benchmarks/results/<commit>.json
+    python -m benchmarks.suite --quick              # small sizes only
+    python -m benchmarks.suite --output new.json --compare old.json
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import fetch_comments
+import generate_responses
+import post_parser
+import post_responses
+import storage
+import waits
+from timestamps import utc_now
+from llm_backends import Router, StubBackend
+from benchmarks.fakes import (
+    FakeDriver, FakePostDriver, build_comment_section, build_post_page_html, snapshot_comment_section
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Comments per post; every comment has REPLIES_PER_COMMENT replies
+SIZES = [10, 100, 1000, 5000]
+QUICK_SIZES = [10, 100]
+REPLIES_PER_COMMENT = 2
+
+# Deep threads: few comments, each with many replies
+DEEP_THREADS = (20, 100)
+
+# Timed runs per case; the fastest is reported
+REPEAT = 3
+
+# A case counts as a regression when it is this much slower than the baseline, or makes
+# more WebDriver calls. Cases faster than TIMING_FLOOR seconds are too noisy to time.
+REGRESSION_RATIO = 1.2
+TIMING_FLOOR = 0.001
+
+# Replies posted in the batched posting case
+REPLIES_PER_POST = 10
+
+
+class ExtractorDriver(FakeDriver):
+    def script_result(self, script, *args):
+        if script == fetch_comments.EXTRACT_COMMENTS_SCRIPT:
+            return snapshot_comment_section(args[0])
+        return None
+
+
+def build_posts(comments, replies):
+    """Saved-post records (as fetch_comments stores them) for one synthetic post."""
+    section = snapshot_comment_section(build_comment_section(FakeDriver(), comments, replies))
+    comment_data = [fetch_comments.to_comment_data(comment) for comment in section["comments"]]
+    return [{
+        "Post URL": "https://www.linkedin.com/feed/update/urn:li:activity:1/",
+        "Author": "Post Author",
+        "Time Posted": "5d",
+        "Content": "Synthetic post content for benchmarking.",
+        "Comments": fetch_comments.stamp_comment_times(comment_data, utc_now())
+    }]
+
+
+def count_comments(posts):
+    return sum(1 + len(comment["Replies"]) for post in posts for comment in post["Comments"])
+
+
+def fresh_store(directory, posts=()):
+    """Point the store at a new database file holding only `posts`."""
+    storage.close_connection()
+    storage.DB_FILE_PATH = os.path.join(directory, f"bench-{time.perf_counter_ns()}.db")
+    for post in posts:
+        storage.save_post(storage.post_urn_from_url(post["Post URL"]), post, count_comments([post]))
+
+
+def measure(name, size, prepare, ops, repeat=REPEAT):
+    """
+    Time one case.
+
+    Parameters:
+    - prepare (callable): Returns (run, driver): `run()` does the work once, `driver`
+      is the fake WebDriver it uses (or None). Called again before every run.
+    - ops (int): Units of work per run, for ops/s.
+
+    Returns:
+    - dict: The case's result record.
+    """
+    best = None
+    calls = None
+    for _ in range(repeat):
+        run, driver = prepare()
+        before = driver.round_trips if driver else 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        calls = driver.round_trips - before if driver else None
+
+    # Peak memory from a separate run, as tracing slows the code down
+    run, driver = prepare()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "size": size,
+        "ops": ops,
+        "wall_seconds": round(best, 6),
+        "ops_per_second": round(ops / best, 1) if best else None,
+        "peak_memory_kb": round(peak / 1024, 1),
+        "webdriver_calls": calls,
+    }
+
+
+def workloads(sizes):
+    """(label, comments, replies per comment) for every synthetic post."""
+    loads = [(str(size), size, REPLIES_PER_COMMENT) for size in sizes]
+    comments, replies = DEEP_THREADS
+    loads.append((f"deep-{comments}x{replies}", comments, replies))
+    return loads
+
+
+def run_suite(sizes, work_dir):
+    results = []
+    generate_responses.llm = Router([StubBackend()])
+    post_responses.wait_for_network_idle = functools.partial(waits.wait_for_network_idle, idle=0, poll=0)
+
+    for label, comments, replies in workloads(sizes):
+        total = comments * (1 + replies)
+        print(f"workload {label}: {total} comments and replies", file=sys.stderr)
+
+        # Fetch: legacy per-element parsing, single-script extraction, page-source parsing
+        def prepare_parse():
+            driver = FakeDriver()
+            section = build_comment_section(driver, comments, replies)
+            return (lambda: fetch_comments.parse_comments(section)), driver
+        results.append(measure("parse_comments", label, prepare_parse, total))
+
+        def prepare_extract():
+            driver = ExtractorDriver()
+            section = build_comment_section(driver, comments, replies)
+            return (lambda: fetch_comments.extract_comments(driver, section)), driver
+        results.append(measure("extract_comments", label, prepare_extract, total))
+
+        html = build_post_page_html(comments, replies)
+        results.append(measure("parse_post_page", label, lambda: ((lambda: post_parser.parse_post_page(html)), None), total))
+
+        # Generate: filtering, text cleaning and the whole stage with the stub model
+        posts = build_posts(comments, replies)
+        texts = [
+            entry["Comment Text"]
+            for post in posts for comment in post["Comments"] for entry in [comment] + comment["Replies"]
+        ]
+        results.append(measure("clean_text", label, lambda: ((lambda: [generate_responses.clean_text(t) for t in texts]), None), len(texts)))
+        # Every synthetic comment is less than an hour old, and a fresh store has no watermark
+        def prepare_filter():
+            fresh_store(work_dir, posts)
+            return (lambda: generate_responses.filter_recent_comments()), None
+        results.append(measure("filter_recent_comments", label, prepare_filter, count_comments(posts)))
+
+        def prepare_process():
+            fresh_store(work_dir, posts)
+            return (lambda: generate_responses.process_comments()), None
+        results.append(measure("process_comments", label, prepare_process, count_comments(posts), repeat=1))
+
+        # Post: one reply to the last comment (needs expansion), and a batch on one post
+        url = posts[0]["Post URL"]
+        ids = [comment["Comment ID"] for comment in posts[0]["Comments"]]
+
+        def prepare_reply():
+            driver = FakePostDriver({url: ids})
+
+            def run():
+                assert post_responses.reply_to_comment(driver, url, "text", "name", "Thanks!", comment_id=ids[-1])
+            return run, driver
+        results.append(measure("reply_to_comment", label, prepare_reply, 1))
+
+        batch = [
+            {"Post URL": url, "Comment ID": comment_id, "Comment Text": "text", "Commenter Name": "name", "AI Response": "Thanks!"}
+            for comment_id in ids[-REPLIES_PER_POST:]
+        ]
+
+        def prepare_batch():
+            driver = FakePostDriver({url: ids})
+
+            def run():
+                assert len(list(post_responses.reply_on_post(driver, url, batch))) == len(batch)
+            return run, driver
+        results.append(measure("reply_on_post", label, prepare_batch, len(batch)))
+
+    storage.close_connection()
+    return results
+
+
+def git_version():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(RESULTS_DIR)
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    """Print each case against a baseline file. Returns the number of regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = {(r["name"], r["size"]): r for r in json.load(file)["results"]}
+
+    regressions = 0
+    print(f"{'case':>36} {'wall x':>8} {'calls':>14}  status")
+    for result in results:
+        old = baseline.get((result["name"], result["size"]))
+        if old is None:
+            continue
+        ratio = result["wall_seconds"] / old["wall_seconds"] if old["wall_seconds"] else 1.0
+        calls = f"{old['webdriver_calls']}->{result['webdriver_calls']}" if result["webdriver_calls"] is not None else "-"
+        slower = ratio > REGRESSION_RATIO and old["wall_seconds"] >= TIMING_FLOOR
+        worse = slower or (result["webdriver_calls"] or 0) > (old["webdriver_calls"] or 0)
+        regressions += worse
+        case = f"{result['name']}[{result['size']}]"
+        print(f"{case:>36} {ratio:>8.2f} {calls:>14}  {'REGRESSION' if worse else 'ok'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="only run the small sizes")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<git version>.json)")
+    parser.add_argument("--compare", help="baseline result file to compare against")
+    args = parser.parse_args()
+
+    version = git_version()
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f"{version}.json"))
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    # Work in a scratch directory so the store and legacy files of a real setup are untouched
+    with tempfile.TemporaryDirectory() as work_dir:
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            results = run_suite(QUICK_SIZES if args.quick else SIZES, work_dir)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "version": version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{'case':>36} {'wall s':>9} {'ops/s':>12} {'peak KB':>10} {'calls':>8}")
+    for r in results:
+        case = f"{r['name']}[{r['size']}]"
+        calls = r["webdriver_calls"] if r["webdriver_calls"] is not None else "-"
+        print(f"{case:>36} {r['wall_seconds']:>9.4f} {r['ops_per_second']:>12} {r['peak_memory_kb']:>10} {calls:>8}")
+    print(f"results written to {output}")
+
+    if baseline and compare(results, baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Comments read from LinkedIn's own JSON API responses instead of the rendered page.
+
+The web app loads comments and replies from its Voyager API over XHR. The requests are
+seen as CDP Network events in the performance log (enabled in
+session_manager.create_driver), and `Network.getResponseBody` returns their JSON.
+Decoding that is cheaper than walking the DOM, and it gives LinkedIn's comment URNs
+(the same ids the DOM carries in `data-id`) and exact creation times.
+
+Responses use LinkedIn's normalized JSON: entities are listed in "included" (or
+nested in "data"/"elements") with a "$type", and refer to each other by URN. A
+comment entity looks like:
+
+    {"$type": "com.linkedin.voyager.dash.social.Comment",
+     "entityUrn": "urn:li:fsd_comment:(7101,urn:li:activity:7100)",
+     "urn": "urn:li:comment:(activity:7100,7101)",
+     "commentary": {"text": "Great post!"},
+     "commenter": {"title": {"text": "Jane Doe"}},
+     "createdAt": 1760781600000,
+     "*parentComment": "urn:li:fsd_comment:(7099,urn:li:activity:7100)"}
+
+Replies carry a reference to their parent comment; top-level comments do not.
+"""
+import base64
+import json
+import weakref
+from datetime import datetime, timezone
+
+import waits
+from timestamps import format_relative_time, to_utc_iso, utc_now
+
+# A response is read when its URL contains the API prefix and one of the markers
+# (REST endpoints and GraphQL query ids for comments and replies)
+API_URL_PREFIX = "/voyager/api/"
+COMMENT_URL_MARKERS = ("comments", "Comments", "replies", "Replies")
+
+COMMENT_TYPES = {
+    "com.linkedin.voyager.dash.social.Comment",
+    "com.linkedin.voyager.feed.Comment",
+}
+
+# Keys under which a reply refers to its parent comment
+PARENT_KEYS = ("*parentComment", "parentComment", "parentCommentUrn")
+
+# Request ids of comment responses seen per driver since start_capture
+_requests = weakref.WeakKeyDictionary()
+
+
+def is_comment_response(url):
+    return API_URL_PREFIX in url and any(marker in url for marker in COMMENT_URL_MARKERS)
+
+def _observe(driver, events):
+    """waits listener: remember the request ids of comment API responses."""
+    request_ids = _requests.get(driver)
+    if request_ids is None:
+        return
+    for event in events:
+        if event["method"] != "Network.responseReceived":
+            continue
+        params = event.get("params", {})
+        if is_comment_response(params.get("response", {}).get("url", "")) and params.get("requestId") not in request_ids:
+            request_ids.append(params.get("requestId"))
+
+waits.network_event_listeners.append(_observe)
+
+def start_capture(driver):
+    """Start collecting comment API responses for the next page the driver opens."""
+    _requests.pop(driver, None)
+    waits.read_network_events(driver)  # Drop events from earlier pages
+    _requests[driver] = []
+
+def _walk_entities(value):
+    """Yield every dict with a "$type" below a JSON value."""
+    if isinstance(value, dict):
+        if "$type" in value:
+            yield value
+        for child in value.values():
+            yield from _walk_entities(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _walk_entities(child)
+
+def _text(value):
+    """Text of a TextViewModel-like value ({"text": ...}) or a plain string."""
+    if isinstance(value, dict):
+        return value.get("text")
+    return value if isinstance(value, str) else None
+
+def _reference(value):
+    """URN a reference points to: a string, or a nested entity's urn/entityUrn."""
+    if isinstance(value, dict):
+        return value.get("urn") or value.get("entityUrn")
+    return value if isinstance(value, str) else None
+
+def parse_comment_responses(payloads, reference=None):
+    """
+    Build the comment tree from decoded comment API responses.
+
+    Parameters:
+    - payloads (list): Decoded JSON bodies, in the order they were received.
+    - reference (datetime): Time the relative "time" labels are computed against.
+
+    Returns:
+    - dict: {"comments": [...], "errors": int} in the shape of EXTRACT_COMMENTS_SCRIPT in
+      fetch_comments.py, oldest first. Each entry also has "commented_at", its UTC ISO
+      creation time. errors counts comment entities missing a required field.
+    """
+    reference = reference or utc_now()
+    entities = {}
+    aliases = {}
+    errors = 0
+    for payload in payloads:
+        for entity in _walk_entities(payload):
+            if entity["$type"] not in COMMENT_TYPES:
+                continue
+            urn = entity.get("urn") or entity.get("entityUrn")
+            text = _text(entity.get("commentary"))
+            name = _text((entity.get("commenter") or {}).get("title"))
+            created_at = entity.get("createdAt")
+            if urn is None or text is None or name is None or not isinstance(created_at, (int, float)):
+                errors += 1
+                continue
+            # Later responses (e.g. after an edit) replace earlier ones
+            entities[urn] = entity
+            aliases[urn] = urn
+            if entity.get("entityUrn"):
+                aliases[entity["entityUrn"]] = urn
+
+    comments = {}
+    replies = []
+    for urn, entity in sorted(entities.items(), key=lambda item: item[1]["createdAt"]):
+        created = datetime.fromtimestamp(entity["createdAt"] / 1000, tz=timezone.utc)
+        comment = {
+            "id": urn,
+            "text": _text(entity["commentary"]),
+            "name": _text(entity["commenter"]["title"]),
+            "time": format_relative_time(created, reference),
+            "commented_at": to_utc_iso(created),
+            "replies": []
+        }
+        parent = next((_reference(entity[key]) for key in PARENT_KEYS if entity.get(key)), None)
+        if parent is None:
+            comments[urn] = comment
+        else:
+            replies.append((aliases.get(parent, parent), comment))
+
+    # Replies whose parent was not captured cannot be placed
+    for parent, reply in replies:
+        if parent in comments:
+            comments[parent]["replies"].append(reply)
+        else:
+            errors += 1
+
+    return {"comments": list(comments.values()), "errors": errors}
+
+def read_comments(driver):
+    """
+    Decode the comment API responses captured since start_capture.
+
+    Returns:
+    - dict: As parse_comment_responses, plus "responses", the number of response bodies
+      read, and "unreadable", the number that could not be fetched or decoded.
+    """
+    waits.read_network_events(driver)  # Pick up responses that arrived after the last wait
+    payloads = []
+    unreadable = 0
+    for request_id in _requests.get(driver) or []:
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            data = body["body"]
+            if body.get("base64Encoded"):
+                data = base64.b64decode(data).decode("utf-8")
+            payloads.append(json.loads(data))
+        except Exception:
+            unreadable += 1  # Evicted from Chrome's buffer, or not JSON
+
+    result = parse_comment_responses(payloads)
+    result["responses"] = len(payloads)
+    result["unreadable"] = unreadable
+    return result
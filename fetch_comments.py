@@ -1,23 +1,102 @@
 import re
-import csv
 import random
-import json
 import time
-from bs4 import BeautifulSoup
-from selenium import webdriver
+import queue
+import threading
+from datetime import datetime, timedelta
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import NoSuchElementException
+from session_manager import get_driver, close_driver, create_worker_driver, has_session_cookie, is_logged_out
+from post_parser import parse_post_page
+import storage
+import metrics
+import scheduler
+import comment_api
+from timestamps import parse_relative_time, to_utc_iso, utc_now
+from waits import human_pause, wait_for_network_idle
 
-LOGIN_URL = "https://www.linkedin.com/login"
 ALL_ACTIVITY_URL = "https://www.linkedin.com/in/siddharamayya-mathapati/recent-activity/all/"  ## replace with your account name/url
 
+
+# How post pages are read after expansion: "live" extracts the comment tree with one
+# in-page script (EXTRACT_COMMENTS_SCRIPT), "source" parses one page_source snapshot
+# offline with BeautifulSoup (slower: the whole page is sent over and re-parsed), "api"
+# decodes the comment JSON the page fetched itself (see comment_api.py) and falls back
+# to "live" when that misses comments shown on the page
+PARSE_MODE = "live"
+
+# Number of browsers fetching posts in parallel, the main driver included; 1 fetches
+# with the main driver only
+FETCH_WORKERS = 1
+
+# Extra worker browsers, kept open between cycles like the main driver
+_worker_drivers = []
+_worker_lock = threading.Lock()
+
+# The activity page is scrolled only until a post recorded by an earlier run shows up.
+# Older posts are refreshed by a full scroll once per this interval.
+FULL_ACTIVITY_SCAN_INTERVAL = timedelta(hours=24)
+
+# Collects the URNs of activity cards as they are added, with a MutationObserver that
+# only looks at added nodes. Optionally scrolls, then resolves with the URNs found after
+# the first `previous` ones as soon as there are any, or with [] at the timeout.
+ACTIVITY_SCROLL_SCRIPT = """
+const previous = arguments[0];
+const scroll = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const selector = '.feed-shared-update-v2[data-urn]';
+let state = window.__activityCards;
+if (!state || !document.contains(state.root)) {
+    const root = document.querySelector('.scaffold-finite-scroll__content') || document.body;
+    state = {root: root, urns: [], seen: new Set(), waiter: null};
+    const add = (card) => {
+        const urn = card.getAttribute('data-urn');
+        if (urn && !state.seen.has(urn)) {
+            state.seen.add(urn);
+            state.urns.push(urn);
+        }
+    };
+    root.querySelectorAll(selector).forEach(add);
+    state.observer = new MutationObserver((records) => {
+        for (const record of records) {
+            for (const node of record.addedNodes) {
+                if (node.nodeType !== Node.ELEMENT_NODE) continue;
+                if (node.matches(selector)) add(node);
+                node.querySelectorAll(selector).forEach(add);
+            }
+        }
+        if (state.waiter) state.waiter();
+    });
+    state.observer.observe(root, {childList: true, subtree: true});
+    window.__activityCards = state;
+}
+if (scroll) window.scrollTo(0, document.body.scrollHeight);
+if (state.urns.length > previous) {
+    done(state.urns.slice(previous));
+    return;
+}
+let timer = null;
+const finish = () => {
+    state.waiter = null;
+    clearTimeout(timer);
+    done(state.urns.slice(previous));
+};
+state.waiter = () => {
+    if (state.urns.length > previous) finish();
+};
+timer = setTimeout(finish, timeoutMs);
+"""
+
+# Reads every activity card's URN and comment count label in one round trip
+ACTIVITY_CARDS_SCRIPT = """
+const root = document.querySelector('.scaffold-finite-scroll__content') || document.body;
+return Array.from(root.querySelectorAll('.feed-shared-update-v2[data-urn]'), (card) => {
+    const counts = card.querySelector("[class*='social-details-social-counts__comments']");
+    return [card.getAttribute('data-urn'), counts ? counts.innerText : ''];
+});
+"""
+
 # List of common user-agent strings for rotation
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -85,116 +164,77 @@ def clean_text(text):
     text = re.sub(r"\s+", " ", text)  # Replace multiple spaces with a single space
     return text.strip()
 
-def login_to_linkedin(username, password, headless=False):
-    service = Service(ChromeDriverManager().install())
-    chrome_options = Options()
-
-    # Optional headless mode
-    if headless:
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(service=service)#, options=chrome_options)
-    driver.get(LOGIN_URL)
-
-    try:
-        # Input username and password
-        username_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, 'username'))
-        )
-        username_field.send_keys(username)
-
-        password_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, 'password'))
-        )
-        password_field.send_keys(password)
-
-        # Try to locate the "Remember me" checkbox
-        try:
-            remember_me_checkbox = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "rememberMeOptIn-checkbox"))
-                )
-            driver.execute_script("arguments[0].checked = false;", remember_me_checkbox)
-        except TimeoutException:
-            pretty_display("Remember me checkbox not found. Continuing...", 'WARNING')
-
-        # Click login
-        login_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CLASS_NAME, "btn__primary--large"))
-        )
-        login_button.click()
-
-        # Wait for CAPTCHA manual resolution
-        pretty_display("If CAPTCHA is present, please solve it manually.", 'WARNING')
-        input("Once logged in, press Enter to continue...")
+def parse_count(text):
+    """Extract the number from a count label like '1,234 comments' or '1.2K comments'."""
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*([KkMm]?)", text or "")
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", ""))
+    multiplier = {"k": 1000, "m": 1000000}.get(match.group(2).lower(), 1)
+    return int(number * multiplier)
 
-        # Verify successful login
-        try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "scaffold-layout"))
-            )
-            pretty_display("Login verified successfully!", 'SUCCESS')
-        except TimeoutException:
-            pretty_display("Login verification failed. Ensure you're on the homepage after CAPTCHA.", 'ERROR')
-            driver.quit()
-            return None
+def scroll_to_load_all_posts(driver, max_scrolls=20, scroll_delay=5, retries=3, known_urns=None):
+    """
+    Scrolls to the bottom of the page to load posts, with retries.
 
-    except Exception as e:
-        pretty_display(f"Login process encountered an error: {e}", 'ERROR')
-        driver.quit()
-        return None
+    New cards are counted by an in-page observer (ACTIVITY_SCROLL_SCRIPT), and each
+    scroll returns as soon as new posts appear.
 
-    return driver
+    Parameters:
+    - known_urns (set): URNs recorded by earlier runs. Scrolling stops as soon as one
+      of them is loaded, since everything below it is older. None scrolls to the end.
 
-def scroll_to_load_all_posts(driver, max_scrolls=20, scroll_delay=5, retries=3):
-    """
-    Scrolls to the bottom of the page to load all posts, with retries and random delays.
+    Returns:
+    - int: The number of scrolls that loaded new posts.
     """
+    known_urns = known_urns or set()
     scroll_count = 0
     retry_count = 0
 
-    # Get the initial number of posts
-    initial_posts = driver.find_elements(By.CLASS_NAME, "feed-shared-update-v2")
-    #pretty_display(f"Initial number of posts: {len(initial_posts)}", 'INFO')
-
-    while scroll_count < max_scrolls:
-        # Scroll to the bottom of the page
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        #pretty_display(f"Scrolled to bottom. Scroll count: {scroll_count + 1}", 'INFO')
+    # Posts already on the page
+    urns = driver.execute_async_script(ACTIVITY_SCROLL_SCRIPT, 0, False, 0)
+    post_count = len(urns)
 
-        # Add a random delay to mimic human behavior
-        time.sleep(random.uniform(2, 4))  # Increased delay for better loading
+    while scroll_count < max_scrolls and not known_urns.intersection(urns):
+        # Optional human-like pause (see waits.HUMAN_JITTER)
+        human_pause()
 
-        # Wait for new content to load
-        try:
-            # Wait for at least one new post to appear
-            WebDriverWait(driver, scroll_delay).until(
-                lambda d: len(d.find_elements(By.CLASS_NAME, "feed-shared-update-v2")) > len(initial_posts)
-            )
-            # Update the initial_posts count
-            initial_posts = driver.find_elements(By.CLASS_NAME, "feed-shared-update-v2")
-            #pretty_display(f"New posts loaded. Total posts: {len(initial_posts)}", 'INFO')
+        # Scroll to the bottom and wait for at least one new post to appear
+        urns = driver.execute_async_script(ACTIVITY_SCROLL_SCRIPT, post_count, True, int(scroll_delay * 1000))
+        if urns:
+            post_count += len(urns)
             retry_count = 0  # Reset retry count if new posts are loaded
-        except TimeoutException:
+        else:
             retry_count += 1
-            #pretty_display(f"No new posts loaded. Retry count: {retry_count}", 'INFO')
             if retry_count >= retries:
                 # If no new posts are loaded after retries, stop scrolling
-                #pretty_display("Max retries reached. Stopping scrolling.", 'INFO')
                 break
             continue  # Retry scrolling
 
         # Increment the scroll count
         scroll_count += 1
 
-    #pretty_display(f"Finished scrolling. Total scrolls: {scroll_count}")
+    return scroll_count
 
-    
-def get_and_save_all_activity_data(driver, output_file="assets/activity_data.csv"):
+def full_activity_scan_due(now=None):
+    """Whether the next activity scrape should scroll past the already-known posts."""
+    last_scan = storage.get_state("activity_full_scan_at")
+    if last_scan is None:
+        return True
+    now = now or utc_now()
+    return now - datetime.fromisoformat(last_scan) >= FULL_ACTIVITY_SCAN_INTERVAL
+
+def get_and_save_all_activity_data(driver):
     """
-    Fetches LinkedIn activity data and saves the `data-urn` attributes to a CSV file.
+    Fetches LinkedIn activity data and saves the `data-urn` attributes and card comment
+    counts to the store.
+
+    Only the posts above the newest already-known one are loaded, except on a periodic
+    full scan (FULL_ACTIVITY_SCAN_INTERVAL).
     """
+    # Selenium's wait helpers take a third of a second to import, so load them on first use
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     try:
         # Navigate to the All Activity page
         driver.get(ALL_ACTIVITY_URL)
@@ -204,66 +244,114 @@ def get_and_save_all_activity_data(driver, output_file="assets/activity_data.csv
             EC.presence_of_element_located((By.CLASS_NAME, "scaffold-finite-scroll__content"))
         )
 
-        # Scroll to load all posts
-        scroll_to_load_all_posts(driver, max_scrolls=20, scroll_delay=5)
-
-        # Find all activity sections
-        all_activity_data = []
-        activity_page = driver.find_element(By.CLASS_NAME, "scaffold-finite-scroll__content")
-        activity_sections = activity_page.find_elements(By.CLASS_NAME, "feed-shared-update-v2")
+        # Scroll to load new posts, or all posts on a full scan
+        full_scan = full_activity_scan_due()
+        known_urns = None if full_scan else storage.known_post_urns()
+        with metrics.span("activity_scroll", full_scan=int(full_scan)) as span:
+            scrolls = scroll_to_load_all_posts(driver, max_scrolls=20, scroll_delay=5, known_urns=known_urns)
+            span["scrolls"] = scrolls
 
-        # Extract `data-urn` from each activity section
-        for section in activity_sections:
-            data_urn = section.get_attribute("data-urn")
-            if data_urn:
-                all_activity_data.append(data_urn)
+        # Extract `data-urn` and the comment count shown on each activity section
+        all_activity_data = [
+            (data_urn, parse_count(label) if label else 0)
+            for data_urn, label in driver.execute_script(ACTIVITY_CARDS_SCRIPT)
+            if data_urn
+        ]
 
-        # Save data to CSV
-        with open(output_file, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(["Data URN"])  # Write header
-            for urn in all_activity_data:
-                writer.writerow([urn])
+        # Save data to the store
+        storage.save_activity(all_activity_data)
+        if full_scan:
+            storage.set_state("activity_full_scan_at", to_utc_iso(utc_now()))
 
-        pretty_display(f"Activity data successfully saved to {output_file}.", 'SUCCESS')
+        scan = "full scan" if full_scan else "new posts only"
+        pretty_display(f"Activity data for {len(all_activity_data)} posts saved ({scan}, {scrolls} scrolls).", 'SUCCESS')
 
     except Exception as e:
+        is_logged_out(driver)  # Log in again next cycle if the session has ended
         pretty_display(f"An error occurred: {e}", 'ERROR')
 
 
-def load_all_comments(driver):
-    """Load all comments and replies by clicking 'Load more comments' and 'See previous replies' buttons."""
-    try:
-        # Load more comments
-        while True:
-            try:
-                # Find the "Load more comments" button
-                load_more_button = WebDriverWait(driver, 3).until(
-                    EC.presence_of_element_located((By.XPATH, "//button[contains(., 'Load more comments')]"))
-                )
-                # Scroll the button into view and click it
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", load_more_button)
-                driver.execute_script("arguments[0].click();", load_more_button)
-                time.sleep(random.uniform(2, 4))  # Wait for comments to load
-            except TimeoutException:
-                break  # No more "Load more comments" buttons
-
-        # Load previous replies
-        while True:
-            try:
-                # Find the "See previous replies" button
-                see_previous_replies_button = WebDriverWait(driver, 3).until(
-                    EC.presence_of_element_located((By.XPATH, "//button[contains(., 'See previous replies')]"))
-                )
-                # Scroll the button into view and click it
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", see_previous_replies_button)
-                driver.execute_script("arguments[0].click();", see_previous_replies_button)
-                time.sleep(random.uniform(2, 4))  # Wait for replies to load
-            except TimeoutException:
-                break  # No more "See previous replies" buttons
+# Expands every comment thread inside the page. Each round clicks all visible "Load more
+# comments" / "See previous replies" buttons at once and waits for the DOM to settle,
+# until the header's comment count is reached, the `until` selector matches, no
+# expander is left, or a round adds nothing. Resolves with the expansion stats.
+EXPAND_COMMENTS_SCRIPT = """
+const until = arguments[0];
+const quietMs = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+const labels = ['Load more comments', 'See previous replies'];
+const root = document.querySelector('.comments-comments-list') || document.body;
+const parseCount = (text) => {
+    const match = /(\\d[\\d,]*(?:\\.\\d+)?)\\s*([KkMm]?)/.exec(text || '');
+    if (!match) return null;
+    const multiplier = {k: 1000, m: 1000000}[match[2].toLowerCase()] || 1;
+    return Math.floor(parseFloat(match[1].replace(/,/g, '')) * multiplier);
+};
+const header = document.querySelector("[class*='social-details-social-counts__comments']");
+const expected = header ? parseCount(header.innerText) : null;
+const count = () => root.querySelectorAll('.comments-comment-entity').length;
+const expanders = () => Array.from(root.querySelectorAll('button')).filter(
+    (button) => labels.some((label) => button.textContent.includes(label))
+);
+const stats = {rounds: 0, clicks: 0, loaded: 0, comments: count(), expected: expected, reason: null, elapsed: 0};
+const initial = stats.comments;
+const finish = (reason) => {
+    stats.comments = count();
+    stats.loaded = stats.comments - initial;
+    stats.reason = reason;
+    stats.elapsed = Date.now() - started;
+    done(stats);
+};
+const settle = (callback) => {
+    let quietTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(stop, quietMs);
+    });
+    const stop = () => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        callback();
+    };
+    observer.observe(root, {childList: true, subtree: true});
+    quietTimer = setTimeout(stop, quietMs);
+};
+const round = () => {
+    if (until && root.querySelector(until)) return finish('found');
+    if (expected !== null && count() >= expected) return finish('complete');
+    if (Date.now() - started >= timeoutMs) return finish('timeout');
+    const buttons = expanders();
+    if (!buttons.length) return finish('no-expanders');
+    const before = count();
+    buttons.forEach((button) => button.click());
+    stats.rounds += 1;
+    stats.clicks += buttons.length;
+    settle(() => (count() > before || expanders().length < buttons.length) ? round() : finish('stalled'));
+};
+round();
+"""
+
+def load_all_comments(driver, until=None, quiet=0.5, timeout=25):
+    """
+    Load all comments and replies with one injected script (EXPAND_COMMENTS_SCRIPT).
 
+    Parameters:
+    - until (str): CSS selector; stop as soon as it matches, e.g. a comment being looked for.
+    - quiet (float): Seconds without DOM changes that end an expansion round.
+    - timeout (float): Maximum seconds to spend expanding; kept below Selenium's default
+      30 s script timeout.
+
+    Returns:
+    - dict: Expansion stats ("rounds", "clicks", "loaded", "comments", "expected",
+      "reason", "elapsed" in milliseconds), or None if the script failed.
+    """
+    try:
+        return driver.execute_async_script(EXPAND_COMMENTS_SCRIPT, until, int(quiet * 1000), int(timeout * 1000))
     except Exception as e:
         pretty_display(f"Error loading comments or replies: {e}", 'ERROR')
+        return None
 
 
 def parse_comments(comment_section):
@@ -297,6 +385,7 @@ def parse_comments(comment_section):
 
             # Initialize the comment dictionary
             comment_data = {
+                "Comment ID": data_id,
                 "Comment Text": comment_text,
                 "Commenter Name": commenter_name,
                 "Time Commented": time_commented,
@@ -331,6 +420,7 @@ def parse_comments(comment_section):
 
                         # Append the reply data
                         comment_data["Replies"].append({
+                            "Comment ID": reply_data_id,
                             "Comment Text": reply_text,
                             "Commenter Name": replyer_name,
                             "Time Commented": time_replied,
@@ -349,93 +439,405 @@ def parse_comments(comment_section):
 
     return comments
 
-def fetch_post_details_from_file(driver, input_file="assets/activity_data.csv"):
-    """Fetch post details including content, author, time, and comments."""
+# Walks the comments list inside the page and returns the whole comment/reply tree in
+# one round trip. Mirrors parse_comments: every `comments-comment-entity` is visited in
+# document order and replies already seen under their parent are skipped.
+EXTRACT_COMMENTS_SCRIPT = """
+const section = arguments[0];
+const seen = new Set();
+const textOf = (root, cls) => {
+    const el = root.querySelector('.' + cls);
+    return el ? el.innerText.trim() : null;
+};
+const readEntity = (el) => {
+    const info = el.querySelector('.comments-comment-meta__info');
+    const time = info ? textOf(info, 'comments-comment-meta__data') : null;
+    const text = textOf(el, 'comments-comment-item__main-content');
+    const name = textOf(el, 'comments-comment-meta__description-title');
+    if (text === null || name === null || time === null) {
+        return null;
+    }
+    return {id: el.getAttribute('data-id'), text: text, name: name, time: time, replies: []};
+};
+const comments = [];
+let errors = 0;
+for (const el of section.querySelectorAll('.comments-comment-entity')) {
+    const id = el.getAttribute('data-id');
+    if (seen.has(id)) {
+        continue;
+    }
+    seen.add(id);
+    const comment = readEntity(el);
+    if (comment === null) {
+        errors++;
+        continue;
+    }
+    const repliesList = el.querySelector('.comments-replies-list');
+    if (repliesList) {
+        for (const replyEl of repliesList.querySelectorAll('.comments-comment-entity--reply')) {
+            const replyId = replyEl.getAttribute('data-id');
+            if (seen.has(replyId)) {
+                continue;
+            }
+            seen.add(replyId);
+            const reply = readEntity(replyEl);
+            if (reply === null) {
+                errors++;
+                continue;
+            }
+            comment.replies.push(reply);
+        }
+    }
+    comments.push(comment);
+}
+return {comments: comments, errors: errors};
+"""
+
+def to_comment_data(entity):
+    """Convert a raw extracted comment (and its replies) into the saved comment structure."""
+    comment = {
+        "Comment ID": entity["id"],
+        "Comment Text": clean_text(entity["text"]),
+        "Commenter Name": clean_text(entity["name"]),
+        "Time Commented": clean_text(entity["time"]),
+        "Replies": [to_comment_data(reply) for reply in entity.get("replies", [])]
+    }
+    # Sources with exact creation times (the comment API) provide them directly
+    if entity.get("commented_at"):
+        comment["Commented At"] = entity["commented_at"]
+    return comment
+
+def stamp_comment_times(comments, reference):
+    """
+    Add "Commented At", the absolute UTC time of each comment and reply, from its relative
+    "Time Commented" label as read at `reference`. None when the label is not understood.
+    Comments that already have an exact time keep it.
+    """
+    for comment in comments:
+        if not comment.get("Commented At"):
+            commented_at = parse_relative_time(comment["Time Commented"], reference)
+            comment["Commented At"] = to_utc_iso(commented_at) if commented_at else None
+        stamp_comment_times(comment.get("Replies", []), reference)
+    return comments
+
+def extract_comments(driver, comment_section):
+    """
+    Extract the comment/reply tree of a post with a single `execute_script` call.
+
+    Returns the same structure as parse_comments.
+    """
+    result = driver.execute_script(EXTRACT_COMMENTS_SCRIPT, comment_section)
+    if result["errors"]:
+        pretty_display(f"Skipped {result['errors']} comments or replies that could not be parsed.", 'WARNING')
+    return [to_comment_data(comment) for comment in result["comments"]]
+
+def read_post_header(driver):
+    """Read post content, author and time through live WebDriver elements."""
+    # Extract post content
+    post_content = driver.find_element(By.CLASS_NAME, "feed-shared-update-v2__description").text.strip()
+
+    # Extract author
+    author = driver.find_element(By.CLASS_NAME, "update-components-actor__title").text.strip()
+    author = author.split('\n')[0]
+
+    # Extract time posted
+    time_posted = driver.find_element(By.CLASS_NAME, "update-components-actor__sub-description").text.strip()
+    return post_content, author, time_posted
+
+def read_post_live(driver):
+    """Read post content, author, time and comments through live WebDriver elements."""
+    post_content, author, time_posted = read_post_header(driver)
+
+    # Extract comments
+    comment_section = driver.find_element(By.CLASS_NAME, "comments-comments-list")
     try:
-        # Read the `data-urn` values from the input CSV file
-        with open(input_file, mode="r", newline="", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip the header row
-            urns = [row[0] for row in reader]  # Extract the data-urn column
+        comments = extract_comments(driver, comment_section)
+    except Exception as e:
+        pretty_display(f"In-page extraction failed, falling back to element parsing: {e}", 'WARNING')
+        comments = parse_comments(comment_section)
+
+    return post_content, author, time_posted, comments
 
-        all_activity_data = []
+def read_post_from_source(driver):
+    """Read post content, author, time and comments from one page source snapshot."""
+    page = parse_post_page(driver.page_source)
+    if page["content"] is None or page["author"] is None or page["time"] is None:
+        raise ValueError("Post content, author or time not found in the page source.")
+    if page["errors"]:
+        pretty_display(f"Skipped {page['errors']} comments or replies that could not be parsed.", 'WARNING')
 
-        for data_urn in urns:
+    comments = [to_comment_data(comment) for comment in page["comments"]]
+    return page["content"], page["author"], page["time"], comments
+
+def read_post_from_api(driver, shown=None):
+    """
+    Read post content, author and time from the page and the comments from the comment
+    API responses captured while the post was opened and expanded.
+
+    Parameters:
+    - shown (int): Comments and replies on the page after expansion. When the captured
+      responses hold fewer (e.g. the first comments came with the page itself), the
+      post is read with the in-page extractor instead (read_post_live).
+    """
+    # The last expansion responses may still be loading
+    wait_for_network_idle(driver)
+    captured = comment_api.read_comments(driver)
+    count = sum(1 + len(comment["replies"]) for comment in captured["comments"])
+    if shown is not None and count < shown:
+        pretty_display(
+            f"Comment API responses hold {count} of {shown} comments, reading the page instead.", 'WARNING'
+        )
+        return read_post_live(driver)
+    if captured["errors"] or captured["unreadable"]:
+        pretty_display(
+            f"Skipped {captured['errors']} comments and {captured['unreadable']} API responses that could not be read.",
+            'WARNING'
+        )
+
+    post_content, author, time_posted = read_post_header(driver)
+    comments = [to_comment_data(comment) for comment in captured["comments"]]
+    return post_content, author, time_posted, comments
+
+def fetch_post(driver, data_urn):
+    """
+    Open a post, expand its comments and return the post data.
+
+    Raises on failure so callers can decide whether to retry or skip the post.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    # Construct the post URL
+    post_url = f"https://www.linkedin.com/feed/update/{data_urn}/"
+    with metrics.span("post_fetch"):
+        if PARSE_MODE == "api":
+            comment_api.start_capture(driver)
+        driver.get(post_url)
+
+        # Wait for the page to load
+        comment_button = WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'button[aria-label="Comment"]'))
+        )
+        human_pause()
+
+        # Click "Comment" button to load comments
+        driver.execute_script("arguments[0].click();", comment_button)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "comments-comments-list"))
+        )
+        wait_for_network_idle(driver)
+
+        # Load all comments and replies
+        with metrics.span("comment_expansion") as span:
+            expansion = load_all_comments(driver) or {}
+            span["comments_loaded"] = expansion.get("loaded", 0)
+
+        with metrics.span("parse") as span:
+            if PARSE_MODE == "source":
+                post_content, author, time_posted, comments = read_post_from_source(driver)
+            elif PARSE_MODE == "api":
+                post_content, author, time_posted, comments = read_post_from_api(driver, expansion.get("comments"))
+            else:
+                post_content, author, time_posted, comments = read_post_live(driver)
+            # The relative labels are only true now, so store the absolute times
+            stamp_comment_times(comments, utc_now())
+            span["comments"] = len(comments)
+
+    return {
+        "Post URL": post_url,
+        "Author": clean_text(author),
+        "Time Posted": clean_text(time_posted).split(' ')[0],
+        "Content": clean_text(post_content),
+        "Comments": comments
+    }
+
+def get_worker_drivers(count, driver_factory=create_worker_driver):
+    """
+    Return up to `count` extra logged-in browsers from the worker pool, starting the
+    missing ones. Browsers that lost their session or were left on a login wall are
+    replaced. Starting a worker
+    restores the saved cookies with one page load, which counts against the page budget.
+    """
+    with _worker_lock:
+        lost = [driver for driver in _worker_drivers if not has_session_cookie(driver) or is_logged_out(driver)]
+        for driver in lost:
+            _worker_drivers.remove(driver)
             try:
-                # Construct the post URL
-                post_url = f"https://www.linkedin.com/feed/update/{data_urn}/"
-                driver.get(post_url)
-                time.sleep(random.uniform(3, 5))  # Wait for the page to load
-
-                # Extract post content
-                post_content = driver.find_element(By.CLASS_NAME, "feed-shared-update-v2__description").text.strip()
-                post_content = clean_text(post_content)
-
-                # Extract author
-                author = driver.find_element(By.CLASS_NAME, "update-components-actor__title").text.strip()
-                author = author.split('\n')[0]
-                author = clean_text(author)
-                
-
-                # Extract time posted
-                time_posted = driver.find_element(By.CLASS_NAME, "update-components-actor__sub-description").text.strip()
-                time_posted = clean_text(time_posted)
-                time_posted = time_posted.split(' ')[0]
-
-                # Click "Comment" button to load comments
-                comment_button = driver.find_element(By.CSS_SELECTOR, 'button[aria-label="Comment"]')
-                driver.execute_script("arguments[0].click();", comment_button)
-                time.sleep(random.uniform(2, 4))  # Wait for comments to load
-
-                # Load all comments and replies
-                load_all_comments(driver)
-
-                # Extract comments
-                comment_section = driver.find_element(By.CLASS_NAME, "comments-comments-list")
-                comments = parse_comments(comment_section)
-
-                # Append post data
-                all_activity_data.append({
-                    "Post URL": post_url,
-                    "Author": author,
-                    "Time Posted": time_posted,
-                    "Content": post_content,
-                    "Comments": comments
-                })
+                driver.quit()
+            except Exception:
+                pass
 
+        while len(_worker_drivers) < count:
+            try:
+                driver = driver_factory()
             except Exception as e:
-                pretty_display(f"Error processing post {data_urn}: {e}", 'ERROR')
+                pretty_display(f"Error starting a fetch worker browser: {e}", 'ERROR')
+                break
+            scheduler.budget.spend()
+            if not driver:
+                break
+            _worker_drivers.append(driver)
+        return _worker_drivers[:count]
+
+def close_worker_drivers():
+    """Quit the worker pool's browsers, if any."""
+    with _worker_lock:
+        for driver in _worker_drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        _worker_drivers.clear()
+
+def fetch_posts_parallel(drivers, urns, fetch=fetch_post):
+    """
+    Fetch posts with a pool of browsers taking URNs from a shared queue.
+
+    Parameters:
+    - drivers (list): Logged-in browsers, one per worker. They are left open.
+    - urns (list): Post URNs to fetch.
+    - fetch (callable): fetch(driver, urn) -> post data; raises on failure.
 
-        return json.dumps(all_activity_data, indent=4)
+    Returns:
+    - tuple: (results, stats). results is a list of (urn, post data or None) in the
+      same order as `urns`; stats holds one dict per worker.
+    """
+    work = queue.Queue()
+    for index, urn in enumerate(urns):
+        work.put((index, urn))
+
+    results = [None] * len(urns)
+    stats = [{"Worker": i, "Posts": 0, "Errors": 0, "Seconds": 0.0} for i in range(len(drivers))]
+
+    def worker(worker_id, driver):
+        started = time.perf_counter()
+        try:
+            while True:
+                try:
+                    index, urn = work.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    results[index] = fetch(driver, urn)
+                    stats[worker_id]["Posts"] += 1
+                except Exception as e:
+                    stats[worker_id]["Errors"] += 1
+                    is_logged_out(driver)
+                    pretty_display(f"Error processing post {urn}: {e}", 'ERROR')
+        finally:
+            stats[worker_id]["Seconds"] = time.perf_counter() - started
+
+    threads = [threading.Thread(target=worker, args=(i, driver), daemon=True) for i, driver in enumerate(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return list(zip(urns, results)), stats
+
+def format_worker_stats(stats):
+    """Format per-worker throughput for pretty_display."""
+    lines = []
+    for worker in stats:
+        rate = worker["Posts"] / worker["Seconds"] * 60 if worker["Seconds"] else 0.0
+        lines.append(
+            f"Worker {worker['Worker']}: {worker['Posts']} posts, {worker['Errors']} errors, "
+            f"{worker['Seconds']:.1f}s, {rate:.1f} posts/min"
+        )
+    return "\n".join(lines)
+
+def fetch_sequentially(driver, urns):
+    """Yield (urn, post data or None) for each URN, fetching one post at a time."""
+    for data_urn in urns:
+        try:
+            yield data_urn, fetch_post(driver, data_urn)
+        except Exception as e:
+            is_logged_out(driver)  # Log in again next cycle if the session has ended
+            pretty_display(f"Error processing post {data_urn}: {e}", 'ERROR')
+            yield data_urn, None
+
+def iter_post_details(driver):
+    """
+    Fetch and store the posts that are due for polling, yielding each post as soon as
+    it is stored.
 
+    The scheduler decides which posts are due and how many fit in the page budget
+    (see scheduler.py). Every fetch updates the post's comment rate and next poll time.
+    With FETCH_WORKERS > 1 the posts are fetched by `driver` and the worker pool's
+    browsers together, and yielded once they are done.
+    """
+    storage.mark_fetch_started()
+
+    # Due posts, most promising first, as many as the page budget allows
+    due = storage.load_due_posts(to_utc_iso(utc_now()))
+    chosen = scheduler.select_due_posts(due, scheduler.budget.available())
+    chosen = chosen[:scheduler.budget.take(len(chosen))]
+    rows = {row["urn"]: row for row in chosen}
+    deferred = len(due) - len(chosen)
+
+    started = time.perf_counter()
+    if FETCH_WORKERS > 1 and len(rows) > 1:
+        drivers = [driver] + get_worker_drivers(min(FETCH_WORKERS, len(rows)) - 1)
+        fetched, stats = fetch_posts_parallel(drivers, list(rows))
+        pretty_display(format_worker_stats(stats), 'INFO')
+    else:
+        fetched = fetch_sequentially(driver, list(rows))
+
+    fetched_count = 0
+    for data_urn, post in fetched:
+        if post is None:
+            continue  # Still due, so it is retried next cycle
+
+        # Store the post; this also moves its watermark, so only successful fetches count
+        row = rows[data_urn]
+        # The bot's own replies do not make the post look more active
+        new_comments = storage.save_post(data_urn, post, row["card_comment_count"], author=storage.POST_AUTHOR)
+        scheduler.record_poll(row, new_comments, post["Time Posted"])
+        fetched_count += 1
+        yield post
+
+    elapsed = time.perf_counter() - started
+    per_post = elapsed / len(rows) if rows else 0.0
+    summary = f"Fetched {fetched_count} due posts in {elapsed:.1f}s ({per_post:.1f}s per post)."
+    if deferred:
+        summary += f" {deferred} more due posts wait for the page budget."
+    pretty_display(summary, 'INFO')
+
+def fetch_post_details(driver):
+    """
+    Fetch post details including content, author, time, and comments, and store them.
+
+    Returns:
+    - list: The posts fetched in this run, or None on error.
+    """
+    try:
+        return list(iter_post_details(driver))
     except Exception as e:
         pretty_display(f"Error fetching post details: {e}", 'ERROR')
         return None
 
 
-def save_json_to_file(json_data, file_path="assets/linkedin_activity.json"):
-    try:
-        with open(file_path, "w") as json_file:
-            json_file.write(json_data)
-        pretty_display(f"LinkedIn activity data saved successfully to {file_path}.", 'SUCCESS')
-    except Exception as e:
-        pretty_display(f"Error saving JSON data: {e}", 'ERROR')
+def refresh_activity(driver):
+    """Scrape the activity page if it is due (scheduler.ACTIVITY_POLL_INTERVAL) and the page budget allows."""
+    if scheduler.activity_scrape_due() and scheduler.budget.take(1):
+        get_and_save_all_activity_data(driver)
+
+def main(driver):
+    """Fetch the activity feed and the posts due for polling using an already logged-in driver."""
+    refresh_activity(driver)
+    fetch_post_details(driver)
 
 
 if __name__ == "__main__":
     username = "your_username"  # Replace with your credentials
     password = "your_password"  # Replace with your credentials
 
-    driver = login_to_linkedin(username, password, headless=True)
+    driver = get_driver(username, password, headless=True)
 
     if driver:
-        get_and_save_all_activity_data(driver)
-        json_data = fetch_post_details_from_file(driver)
-        if json_data:
-            save_json_to_file(json_data)
+        main(driver)
 
-        # Close the browser
-        driver.quit()
+        # Close the browsers
+        close_worker_drivers()
+        close_driver()
     else:
-        pretty_display("Failed to log in, no further actions.", 'ERROR') 
-
+        pretty_display("Failed to log in, no further actions.", 'ERROR')
\ No newline at end of file
@@ -1,19 +1,51 @@
 import re 
 import json
-from groq import Groq  # Import the Groq SDK
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import storage
+from storage import POST_AUTHOR
+import metrics
+from ledger import comment_key
+from llm_backends import Router, GroqBackend
 from datetime import datetime, timedelta
 
-# Initialize the Groq client
-client = Groq(api_key="YOUR_API_KEY")  # Replace with your actual Groq API key
+# LLM backends; each request goes to the fastest healthy one and falls back to the rest.
+# Add more models or endpoints (classes from llm_backends) to the list, e.g.
+#   GroqBackend(api_key="YOUR_API_KEY", model="llama-3.3-70b-versatile"),
+#   OpenAICompatibleBackend("http://localhost:11434/v1", model="llama3.1"),
+# or use [StubBackend()] to run the generation stage offline.
+llm = Router([
+    GroqBackend(api_key="YOUR_API_KEY", model="llama-3.1-8b-instant"),  # Replace with your actual Groq API key
+])
 
-# Path to the JSON file containing LinkedIn activity data
-JSON_FILE_PATH = "assets/linkedin_activity.json"
+# Maximum number of completions in flight at once
+MAX_CONCURRENT_REQUESTS = 4
 
-# Path to save the responses
-RESPONSES_FILE_PATH = "assets/linkedin_responses.json"
+# Answer all new comments on a post with one completion (JSON output) instead of one
+# completion per comment; falls back to per-comment calls if the output does not parse
+BATCH_COMMENTS = True
+MAX_COMMENTS_PER_REQUEST = 10
 
-# Post author name (to filter out comments from the author)
-POST_AUTHOR = "Siddharamayya Mathapati"  #Change to your Linked in Name
+# Footer appended to batched replies; the per-comment prompt asks the model to add it
+RESPONSE_FOOTER = "+-------------------------------------+\n| This is an AI-generated response.   |\n+-------------------------------------+"
+
+# Prompt tokens, requests and seconds spent on completions since the last take_llm_usage()
+_usage = {"Requests": 0, "Comments": 0, "Prompt Tokens": 0, "Prompt Tokens Saved": 0, "Seconds": 0.0, "Seconds Saved": 0.0}
+_usage_lock = threading.Lock()
+
+# Latencies of recent single-comment completions; a batch answering n comments saves
+# about n - 1 of these
+_single_latencies = deque(maxlen=50)
+
+# Comments made longer than this before the fetch that found them are not answered,
+# unless their post was fetched before and they were made after that earlier fetch
+RECENT_COMMENT_WINDOW = timedelta(hours=1)
+
+# Comments whose response generation failed this many times (e.g. refused by the
+# model) are given up on, so they stop holding back the processed-comments watermark
+MAX_GENERATION_ATTEMPTS = 3
 
 # System prompt to guide the AI's behavior
 system_prompt = """
@@ -106,122 +138,112 @@ def clean_text(text):
     text = re.sub(r"\s+", " ", text)  # Replace multiple spaces with a single space
     return text.strip()
 
-import os
-import json
-
-def load_json_data(file_path):
+def recent_since():
     """
-    Load JSON data from the file. If the file is not found in the specified path,
-    it checks the current working directory.
-
-    Parameters:
-    - file_path (str): The path to the JSON file.
+    Lower bound of the range of comments to answer: the processed-comments watermark,
+    the start of the latest fetch whose comments were all processed. Comments are
+    compared by the time they were first fetched, so a post fetched in a later cycle
+    (or retried after a failed fetch) still has its new comments in range.
 
     Returns:
-    - dict or list: The loaded JSON data, or None if the file is not found or invalid.
+    - str: UTC ISO timestamp (see storage.now), or "" before the first processed fetch.
     """
-    try:
-        # Check if the file exists in the specified path
-        if not os.path.isfile(file_path):
-            # If not, check the current working directory
-            file_name = os.path.basename(file_path)
-            current_dir_path = os.path.join(os.getcwd(), file_name)
-            if os.path.isfile(current_dir_path):
-                file_path = current_dir_path
-            else:
-                pretty_display(f"File not found: {file_name} in either {file_path} or the current directory.", 'ERROR')
-                return None
-
-        # Load the JSON file
-        with open(file_path, "r", encoding="utf-8") as file:
-            #data = json.load(file)
-            return json.load(file)
-
-    except json.JSONDecodeError as e:
-        pretty_display(f"Invalid JSON format in file: {file_path}. Error: {e}", 'ERROR')
-        return None
-    except Exception as e:
-        pretty_display(f"Error loading JSON file: {e}", 'ERROR')
-        return None
+    return storage.get_state("comments_processed_until") or ""
 
+def mark_comments_processed():
+    """Move the watermark to the latest fetch; its comments have all been processed."""
+    fetch_started_at = storage.get_state("fetch_started_at")
+    if fetch_started_at:
+        storage.set_state("comments_processed_until", fetch_started_at)
 
-def save_responses(responses, file_path):
-    """Save the responses to a JSON file."""
-    try:
-        if not responses:  # Check if responses are empty
-            # Overwrite the file with an empty JSON object
-            with open(file_path, "w", encoding="utf-8") as file:
-                json.dump({}, file, indent=4)
-            pretty_display(f"No responses. Cleared the file: {file_path}")
-        else:
-            # Save responses to the file
-            with open(file_path, "w", encoding="utf-8") as file:
-                json.dump(responses, file, indent=4)
-            pretty_display(f"Responses saved to {file_path}")
-    except Exception as e:
-        pretty_display(f"Error saving responses: {e}", 'ERROR')
-
-
-def is_recent(time_string):
-    """Check if a comment was made within the last hour."""
-    try:
-        # Parse the time string (e.g., "20m", "4d", "1w")
-        if "m" in time_string:
-            minutes = int(time_string.replace("m", ""))
-            return minutes <= 60  # Within the last hour
-        elif "h" in time_string:
-            hours = int(time_string.replace("h", ""))
-            return hours == 0  # Less than an hour
-        elif "d" in time_string:
-            days = int(time_string.replace("d", ""))
-            return False  # Older than a day
-        elif "w" in time_string:
-            weeks = int(time_string.replace("w", ""))
-            return False  # Older than a week
-        else:
-            return False  # Unknown format
-    except Exception as e:
-        pretty_display(f"Error parsing time string '{time_string}': {e}", 'ERROR')
+def is_recent(comment):
+    """
+    Whether a comment is new enough to answer: made within RECENT_COMMENT_WINDOW before
+    the fetch that first found it, or after the post's previous fetch. Quiet posts are
+    polled hours apart, so their new comments are often older than the window.
+    """
+    if not comment["Commented At"]:
         return False
+    since = datetime.fromisoformat(comment["First Seen"]) - RECENT_COMMENT_WINDOW
+    if comment["Previous Check"]:
+        since = min(since, datetime.fromisoformat(comment["Previous Check"]))
+    return datetime.fromisoformat(comment["Commented At"]) >= since
 
-def filter_recent_comments(data):
-    """Filter comments and replies that are recent and not from the post author."""
+def filter_recent_comments(since=None, post_urls=None):
+    """
+    Return the stored comments and replies first fetched since `since` (default:
+    recent_since()) that are recent (see is_recent), not from the post author and not
+    given up on (MAX_GENERATION_ATTEMPTS), with cleaned text.
+
+    Parameters:
+    - since (str): UTC ISO timestamp (see storage.now).
+    - post_urls (list): Only look at these posts.
+    """
     recent_comments = []
-    for post in data:
-        # Clean the post content
-        post_content = clean_text(post["Content"])
-
-        for comment in post["Comments"]:
-            # Clean the comment text
-            comment_text = clean_text(comment["Comment Text"])
-
-            # Check top-level comments
-            if is_recent(comment["Time Commented"]) and comment["Commenter Name"] != POST_AUTHOR:
-                recent_comments.append({
-                    "Post URL": post["Post URL"],
-                    "Post Content": post_content,  # Include cleaned post content
-                    "Comment Text": comment_text,  # Include cleaned comment text
-                    "Commenter Name": comment["Commenter Name"],
-                    "Time Commented": comment["Time Commented"]
-                })
-
-            # Check replies to the comment
-            for reply in comment.get("Replies", []):
-                # Clean the reply text
-                reply_text = clean_text(reply["Comment Text"])
-
-                if is_recent(reply["Time Commented"]) and reply["Commenter Name"] != POST_AUTHOR:
-                    recent_comments.append({
-                        "Post URL": post["Post URL"],
-                        "Post Content": post_content,  # Include cleaned post content
-                        "Comment Text": reply_text,  # Include cleaned reply text
-                        "Commenter Name": reply["Commenter Name"],
-                        "Time Commented": reply["Time Commented"]
-                    })
+    since = recent_since() if since is None else since
+    for comment in storage.load_comments_seen_since(since, post_urls):
+        if comment["Commenter Name"] == POST_AUTHOR or not is_recent(comment):
+            continue
+        if comment["Generation Attempts"] >= MAX_GENERATION_ATTEMPTS:
+            continue
+        comment["Post Content"] = clean_text(comment["Post Content"])  # Include cleaned post content
+        comment["Comment Text"] = clean_text(comment["Comment Text"])  # Include cleaned comment text
+        recent_comments.append(comment)
     return recent_comments
 
+def estimate_tokens(text):
+    """Rough token count for prompt text (about four characters per token)."""
+    return len(text or "") // 4
+
+def complete(messages, comments=1, max_tokens=150, **options):
+    """
+    Send one chat completion through the backend router and record its latency and
+    token counts (also as an "llm_call" metrics span).
+
+    Parameters:
+    - messages (list): The chat messages.
+    - comments (int): Number of comments answered by this request, for the usage report.
+    - max_tokens (int): Completion token limit.
+
+    Returns:
+    - str: The completion text.
+    """
+    started = time.perf_counter()
+    try:
+        result = llm.complete(
+            messages,
+            max_tokens=max_tokens,  # Increase token limit for more detailed responses
+            temperature=0.7,  # Control randomness (0 = deterministic, 1 = random)
+            **options
+        )
+    except Exception:
+        metrics.record("llm_call", time.perf_counter() - started, ok=False, comments=comments)
+        raise
+    elapsed = time.perf_counter() - started
+    metrics.record("llm_call", elapsed, comments=comments, prompt_tokens=result["Prompt Tokens"],
+                   completion_tokens=result["Completion Tokens"], backend=result["Backend"])
+
+    with _usage_lock:
+        _usage["Requests"] += 1
+        _usage["Comments"] += comments
+        _usage["Prompt Tokens"] += result["Prompt Tokens"]
+        _usage["Seconds"] += elapsed
+        if comments == 1:
+            _single_latencies.append(elapsed)
+
+    # Extract and return the generated response
+    return result["Text"]
+
+def take_llm_usage():
+    """Return the completion usage since the last call and start counting again."""
+    with _usage_lock:
+        usage = dict(_usage)
+        for name in _usage:
+            _usage[name] = 0.0 if name.startswith("Seconds") else 0
+    return usage
+
 def generate_response(post_content, comment_text, commententor_name):
-    """Generate a response using the Groq API."""
+    """Generate a response using the configured LLM backends."""
     try:
         # Define the user prompt (the LinkedIn post and comment)
         user_prompt = f"""
@@ -254,61 +276,258 @@ def generate_response(post_content, comment_text, commententor_name):
         ]
 
         # Send the request to the Groq API
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",  # Replace with the correct Groq model name
-            messages=messages,
-            max_tokens=150,  # Increase token limit for more detailed responses
-            temperature=0.7,  # Control randomness (0 = deterministic, 1 = random)
-        )
-
-        # Extract and return the generated response
-        return response.choices[0].message.content
+        return complete(messages, comments=1, max_tokens=150)
 
     except Exception as e:
         # Handle any errors that occur during the API request
         pretty_display(f"Error generating response: {e}", 'ERROR')
         return None
 
-def process_comments(data):
-    """Process comments, generate responses, and save them."""
-    recent_comments = filter_recent_comments(data)
+def generate_responses_concurrently(comments, max_concurrent=None):
+    """
+    Generate responses for many comments with up to `max_concurrent` requests in flight.
+
+    Returns:
+    - list: One response (or None on failure) per comment, in the same order.
+    """
+    max_concurrent = max_concurrent or MAX_CONCURRENT_REQUESTS
+    if max_concurrent <= 1 or len(comments) <= 1:
+        return [generate_response(c["Post Content"], c["Comment Text"], c["Commenter Name"]) for c in comments]
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrent, len(comments))) as executor:
+        return list(executor.map(
+            lambda c: generate_response(c["Post Content"], c["Comment Text"], c["Commenter Name"]),
+            comments
+        ))
+
+def parse_batch_replies(content, expected_ids):
+    """
+    Read the replies out of a batched completion.
+
+    Returns:
+    - dict: Reply text by comment id for the expected ids that got a non-empty reply,
+      or None if the output is not the requested JSON.
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        # Tolerate prose or a code fence around the JSON object
+        match = re.search(r"\{.*\}", content or "", re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+
+    replies = data.get("replies") if isinstance(data, dict) else None
+    if not isinstance(replies, list):
+        return None
+
+    parsed = {}
+    for reply in replies:
+        if not isinstance(reply, dict):
+            continue
+        reply_id = str(reply.get("id"))
+        text = reply.get("response")
+        if reply_id in expected_ids and isinstance(text, str) and text.strip():
+            parsed[reply_id] = text.strip()
+    return parsed
+
+def generate_batch_responses(post_content, comments):
+    """
+    Generate replies for several comments on the same post with one completion.
+
+    The post and instructions are sent once and the model returns a JSON object with
+    one reply per comment. Comments missing from the output, or all of them if it does
+    not parse, are answered with per-comment calls instead.
+
+    Parameters:
+    - post_content (str): The post the comments belong to.
+    - comments (list): Comment dicts with "Comment Text" and "Commenter Name".
+
+    Returns:
+    - list: One response (or None on failure) per comment, in the same order.
+    """
+    if len(comments) <= 1:
+        return [generate_response(post_content, c["Comment Text"], c["Commenter Name"]) for c in comments]
+
+    # Short local ids keep the prompt small and are easy for the model to copy back
+    ids = [str(number) for number in range(1, len(comments) + 1)]
+    listed = json.dumps(
+        [{"id": i, "commentor": c["Commenter Name"], "comment": c["Comment Text"]} for i, c in zip(ids, comments)],
+        ensure_ascii=False, indent=1
+    )
+    user_prompt = f"""
+        LinkedIn Post:
+        {post_content}
+
+        Comments:
+        {listed}
+
+        You are responding as Siddharamayya Mathapati, the author of the post. Ensure that all responses are written from Siddharamayya's perspective and you are responding to each Commentor separately,
+        Guidelines:
+        1. Keep each response concise, professional, and relevant to its comment.
+        2. Use a friendly and appreciative tone.
+        3. Avoid entioning commentor name in response.
+        4. If a comment is congratulatory, express gratitude and briefly mention the significance of the achievement.
+        5. Avoid overly verbose or generic responses.
+        6. Do not add the AI-generated response footer; it is added automatically.
+        7. No PREAMBLE and NO PLACEHOLDER
+        8. Acknowledges the commenter's input.
+        9. Answer with only a JSON object: {{"replies": [{{"id": "<comment id>", "response": "<your reply>"}}]}}, with one entry for every comment id.
+        """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    parsed = None
+    try:
+        content = complete(messages, comments=0, max_tokens=150 * len(comments),
+                           response_format={"type": "json_object"})
+        parsed = parse_batch_replies(content, set(ids))
+    except Exception as e:
+        pretty_display(f"Error generating batched responses: {e}", 'ERROR')
+
+    if parsed is None:
+        pretty_display(f"Batched output for {len(comments)} comments did not parse; answering them one by one.", 'WARNING')
+        parsed = {}
+    else:
+        # The shared context would otherwise have been sent once per comment
+        shared = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) - estimate_tokens(listed)
+        with _usage_lock:
+            _usage["Comments"] += len(parsed)
+            _usage["Prompt Tokens Saved"] += shared * max(len(parsed) - 1, 0)
+            # Estimated from the single-comment calls seen so far; none yet means no estimate
+            if _single_latencies:
+                single = sum(_single_latencies) / len(_single_latencies)
+                _usage["Seconds Saved"] += single * max(len(parsed) - 1, 0)
+
+    responses = []
+    for reply_id, comment in zip(ids, comments):
+        if reply_id in parsed:
+            responses.append(f"{parsed[reply_id]}\n{RESPONSE_FOOTER}")
+        else:
+            responses.append(generate_response(post_content, comment["Comment Text"], comment["Commenter Name"]))
+    return responses
+
+def generate_responses_batched(comments, max_per_request=None, max_concurrent=None):
+    """
+    Generate responses with one completion per post (up to `max_per_request` comments
+    each), running up to `max_concurrent` completions at once.
+
+    Returns:
+    - list: One response (or None on failure) per comment, in the same order.
+    """
+    max_per_request = max_per_request or MAX_COMMENTS_PER_REQUEST
+    max_concurrent = max_concurrent or MAX_CONCURRENT_REQUESTS
+
+    # Group comment positions by post, then split each post into request-sized chunks
+    by_post = {}
+    for position, comment in enumerate(comments):
+        by_post.setdefault(comment["Post URL"], []).append(position)
+    chunks = [
+        positions[start:start + max_per_request]
+        for positions in by_post.values()
+        for start in range(0, len(positions), max_per_request)
+    ]
+
+    def run_chunk(positions):
+        chunk = [comments[position] for position in positions]
+        return generate_batch_responses(chunk[0]["Post Content"], chunk)
+
+    if max_concurrent <= 1 or len(chunks) <= 1:
+        results = [run_chunk(positions) for positions in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_concurrent, len(chunks))) as executor:
+            results = list(executor.map(run_chunk, chunks))
+
+    responses = [None] * len(comments)
+    for positions, chunk_responses in zip(chunks, results):
+        for position, response in zip(positions, chunk_responses):
+            responses[position] = response
+    return responses
+
+def select_new_comments(since=None, post_urls=None):
+    """Return the recent comments (see filter_recent_comments) that have not been answered in an earlier cycle."""
+    recent_comments = filter_recent_comments(since, post_urls)
+    answered = storage.answered_keys(comment_key(comment) for comment in recent_comments)
+    return [comment for comment in recent_comments if comment_key(comment) not in answered]
+
+def build_response_record(comment, response):
+    """Build the stored response record for a comment and its generated reply."""
+    return {
+        "Post URL": comment["Post URL"],
+        "Post Content": comment["Post Content"],  # Include cleaned post content
+        "Comment ID": comment["Comment ID"],
+        "Comment Text": comment["Comment Text"],  # Include cleaned comment text
+        "Commenter Name": comment["Commenter Name"],
+        "Time Commented": comment["Time Commented"],
+        "AI Response": response
+    }
+
+def process_comments(since=None):
+    """
+    Generate and save responses to the stored comments first fetched since `since`
+    (default: recent_since()). The watermark moves once every comment has a response
+    or was given up on; failed ones are retried in the next run, up to
+    MAX_GENERATION_ATTEMPTS times.
+
+    Returns:
+    - list: The responses generated in this run.
+    """
+    # Skip comments that were already answered in an earlier cycle
+    recent_comments = select_new_comments(since)
     if not recent_comments:
         pretty_display("No recent comments found.", 'SUCCESS')
-        return
+        mark_comments_processed()
+        return []
+
+    # Generate responses using Groq, one request per post or several per-comment requests at a time
+    take_llm_usage()
+    if BATCH_COMMENTS:
+        generated = generate_responses_batched(recent_comments)
+    else:
+        generated = generate_responses_concurrently(recent_comments)
+    usage = take_llm_usage()
 
     responses = []
-    for comment in recent_comments:
+    for comment, response in zip(recent_comments, generated):
         pretty_display(f"New Comment from {comment['Commenter Name']} ({comment['Time Commented']}):" , 'WARNING')
         print(f"Comment: {comment['Comment Text']}")
 
-        # Generate a response using Groq
-        response = generate_response(comment["Post Content"], comment["Comment Text"], comment["Commenter Name"])
         if response:
             pretty_display("AI RESPONSE", 'SUCCESS')
             print(response)
               # Separator for readability
 
             # Save the response along with the post URL and comment details
-            responses.append({
-                "Post URL": comment["Post URL"],
-                "Post Content": comment["Post Content"],  # Include cleaned post content
-                "Comment Text": comment["Comment Text"],  # Include cleaned comment text
-                "Commenter Name": comment["Commenter Name"],
-                "Time Commented": comment["Time Commented"],
-                "AI Response": response
-            })
-
-    # Save all responses to a JSON file
-    save_responses(responses, RESPONSES_FILE_PATH)
+            record = build_response_record(comment, response)
+            # Stored right away, so this comment is skipped from now on and queued for posting
+            storage.save_response(record)
+            responses.append(record)
+
+    # Count the failures; comments out of attempts no longer hold back the watermark
+    failed = [comment for comment, response in zip(recent_comments, generated) if not response]
+    storage.record_generation_failures(comment_key(comment) for comment in failed)
+    if all(comment["Generation Attempts"] + 1 >= MAX_GENERATION_ATTEMPTS for comment in failed):
+        mark_comments_processed()
+
+    pretty_display(
+        f"Saved {len(responses)} new responses.\n"
+        f"LLM: {usage['Comments']} comments in {usage['Requests']} requests, "
+        f"{usage['Prompt Tokens']} prompt tokens, {usage['Seconds']:.1f}s "
+        f"(~{usage['Prompt Tokens Saved']} prompt tokens and ~{usage['Seconds Saved']:.1f}s of "
+        f"request time saved by batching)\n"
+        f"{llm.report()}",
+        'INFO'
+    )
+    return responses
 
 def main():
-    # Load the JSON data
-    data = load_json_data(JSON_FILE_PATH)
-    if not data:
-        return
-
-    # Process the comments and generate responses
-    process_comments(data)
+    # Answer the comments fetched since the last processed fetch
+    process_comments()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
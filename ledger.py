@@ -0,0 +1,20 @@
+import hashlib
+
+def comment_key(comment):
+    """
+    Return a stable identity for a comment or response record.
+
+    Uses the post URN and LinkedIn's comment `data-id` when available, otherwise a hash
+    of the commenter and normalized comment text on that post.
+    """
+    post_urn = comment["Post URL"].rstrip("/").rsplit("/", 1)[-1]
+    if comment.get("Comment ID"):
+        return f"{post_urn}|{comment['Comment ID']}"
+
+    normalized = " ".join(comment["Comment Text"].lower().split())
+    digest = hashlib.sha256(f"{comment['Commenter Name']}|{normalized}".encode("utf-8")).hexdigest()
+    return f"{post_urn}|sha256:{digest}"
+
+def reply_hash(reply_text):
+    """Return a short hash of a reply, to tell which text was posted without storing it twice."""
+    return hashlib.sha256(reply_text.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,223 @@
+"""
+LLM backends for response generation, with latency-aware routing.
+
+Each backend sends a chat completion to one model: Groq, any OpenAI-compatible
+endpoint, or a local deterministic stub for offline runs and benchmarks. A Router
+keeps rolling latency and error statistics per backend and sends each request to the
+fastest healthy one, moving on to the next backend when a request fails or times out.
+"""
+import json
+import re
+import threading
+import time
+from collections import deque
+
+# Seconds before a single completion request is abandoned for the next backend
+REQUEST_TIMEOUT = 20
+
+# Number of recent requests the latency percentiles and error rate are computed over
+STATS_WINDOW = 50
+
+# A backend with at least MIN_SAMPLES recent requests and an error rate at or above
+# UNHEALTHY_ERROR_RATE is tried last, until COOLDOWN_SECONDS after its latest failure
+MIN_SAMPLES = 5
+UNHEALTHY_ERROR_RATE = 0.5
+COOLDOWN_SECONDS = 60
+
+
+class BackendStats:
+    """Rolling latency and error statistics for one backend."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.last_failure = None
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.requests += 1
+            self._outcomes.append(ok)
+            if ok:
+                self._latencies.append(seconds)
+            else:
+                self.last_failure = time.monotonic()
+
+    def percentile(self, fraction):
+        """Latency at the given fraction (0.5 for p50) of recent successes, or None."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def error_rate(self):
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def healthy(self, now=None):
+        with self._lock:
+            samples = len(self._outcomes)
+            last_failure = self.last_failure
+        if samples < MIN_SAMPLES or self.error_rate() < UNHEALTHY_ERROR_RATE:
+            return True
+        now = now or time.monotonic()
+        return last_failure is None or now - last_failure >= COOLDOWN_SECONDS
+
+
+class GroqBackend:
+    """A Groq model. The client is created on first use."""
+
+    def __init__(self, api_key, model="llama-3.1-8b-instant", **client_options):
+        self.name = f"groq:{model}"
+        self.model = model
+        self._api_key = api_key
+        # The router handles retries by falling back to the next backend
+        self._client_options = {"max_retries": 0, **client_options}
+        self._client = None
+
+    def complete(self, messages, max_tokens, temperature, timeout, **options):
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=self._api_key, **self._client_options)
+        response = self._client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            **options
+        )
+        usage = getattr(response, "usage", None)
+        return (response.choices[0].message.content, getattr(usage, "prompt_tokens", 0) or 0,
+                getattr(usage, "completion_tokens", 0) or 0)
+
+
+class OpenAICompatibleBackend:
+    """
+    A model behind any OpenAI-compatible chat-completions endpoint, e.g. OpenAI, a
+    vLLM or llama.cpp server, or Ollama. `base_url` is the API root such as
+    "https://api.openai.com/v1"; requests go to `{base_url}/chat/completions`.
+    """
+
+    def __init__(self, base_url, model, api_key=None, name=None):
+        self.name = name or f"{base_url}:{model}"
+        self.model = model
+        self._url = f"{base_url.rstrip('/')}/chat/completions"
+        self._api_key = api_key
+
+    def complete(self, messages, max_tokens, temperature, timeout, **options):
+        import urllib.request
+
+        body = {"model": self.model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        body.update(options)
+        headers = {"Content-Type": "application/json"}
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+
+        request = urllib.request.Request(self._url, data=json.dumps(body).encode("utf-8"), headers=headers)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = json.load(response)
+        usage = data.get("usage") or {}
+        return data["choices"][0]["message"]["content"], usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+class StubBackend:
+    """
+    A local, deterministic stand-in for a model.
+
+    Replies after `latency` seconds (raising TimeoutError if that exceeds the request
+    timeout), fails every `fail_every`-th request when set, and answers batched JSON
+    prompts with one reply per listed comment. Token counts are whitespace word counts.
+    """
+
+    def __init__(self, name="stub", latency=0.0, fail_every=None, reply="Thank you for your comment! I appreciate you taking the time to share your thoughts."):
+        self.name = name
+        self.model = name
+        self.latency = latency
+        self.fail_every = fail_every
+        self.reply = reply
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def complete(self, messages, max_tokens, temperature, timeout, **options):
+        with self._lock:
+            self.requests += 1
+            request_number = self.requests
+        if self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"{self.name} did not answer within {timeout}s")
+        time.sleep(self.latency)
+        if self.fail_every and request_number % self.fail_every == 0:
+            raise ConnectionError(f"{self.name} request {request_number} failed")
+
+        prompt = messages[-1]["content"]
+        prompt_tokens = sum(len(message["content"].split()) for message in messages)
+        if options.get("response_format", {}).get("type") == "json_object":
+            ids = re.findall(r'"id":\s*"([^"]+)"', prompt)
+            text = json.dumps({"replies": [{"id": i, "response": self.reply} for i in ids]})
+        else:
+            text = self.reply
+        return text, prompt_tokens, len(text.split())
+
+
+class Router:
+    """
+    Sends each completion to the fastest healthy backend and falls back to the others.
+
+    Backends are ordered by their rolling p50 latency; backends without successful
+    requests yet come first so every one gets measured. Unhealthy backends are tried last.
+    """
+
+    def __init__(self, backends, timeout=REQUEST_TIMEOUT):
+        self.backends = list(backends)
+        self.timeout = timeout
+        self.stats = {backend.name: BackendStats() for backend in self.backends}
+
+    def ranked(self):
+        """Return the backends in the order the next request would try them."""
+        now = time.monotonic()
+
+        def rank(backend):
+            stats = self.stats[backend.name]
+            p50 = stats.percentile(0.5)
+            return (not stats.healthy(now), p50 is not None, p50 or 0.0)
+
+        return sorted(self.backends, key=rank)
+
+    def complete(self, messages, max_tokens=150, temperature=0.7, **options):
+        """
+        Run one chat completion.
+
+        Returns:
+        - dict: {"Text", "Prompt Tokens", "Completion Tokens", "Backend", "Seconds"} from
+          the backend that answered.
+
+        Raises the last backend's error if every backend failed.
+        """
+        last_error = None
+        for backend in self.ranked():
+            started = time.perf_counter()
+            try:
+                text, prompt_tokens, completion_tokens = backend.complete(messages, max_tokens, temperature, self.timeout, **options)
+            except Exception as e:
+                self.stats[backend.name].record(time.perf_counter() - started, ok=False)
+                last_error = e
+                continue
+            elapsed = time.perf_counter() - started
+            self.stats[backend.name].record(elapsed, ok=True)
+            return {"Text": text, "Prompt Tokens": prompt_tokens, "Completion Tokens": completion_tokens,
+                    "Backend": backend.name, "Seconds": elapsed}
+        raise last_error or RuntimeError("No LLM backend configured")
+
+    def report(self):
+        """One line per backend with its request count, p50/p95 latency and error rate."""
+        lines = []
+        for backend in self.backends:
+            stats = self.stats[backend.name]
+            p50, p95 = stats.percentile(0.5), stats.percentile(0.95)
+            latency = f"p50 {p50:.2f}s, p95 {p95:.2f}s" if p50 is not None else "no successful requests"
+            lines.append(f"{backend.name}: {stats.requests} requests, {latency}, {stats.error_rate():.0%} errors")
+        return "\n".join(lines)
@@ -1,6 +1,17 @@
 import time
-import schedule
-import subprocess
+import threading
+
+# Import the stage modules once. Selenium's heavy parts, webdriver-manager, groq and bs4
+# are imported on first use and then stay loaded between cycles.
+_import_started = time.perf_counter()
+import fetch_comments
+import generate_responses
+import post_responses
+import session_manager
+import pipeline
+import metrics
+import scheduler
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 def pretty_display(message, message_type):
     """
@@ -37,39 +48,108 @@ def pretty_display(message, message_type):
     print(color + '| ' + message + ' |')
     print(color + border + colors['RESET'])
 
-def run_script(script_name):
-    """Run a Python script using subprocess."""
+USERNAME = "your_username"  # Replace with your credentials
+PASSWORD = "your_password"  # Replace with your credentials
+
+# Overlap fetch, generation and posting so replies go out while posts are still being fetched
+STREAMING = False
+
+# Held while a cycle runs, so cycles never overlap
+_cycle_lock = threading.Lock()
+
+def run_stage(stage_name, stage, *args):
+    """Run one workflow stage in-process and return its wall time in seconds."""
+    started = time.perf_counter()
+    ok = False
     try:
-        pretty_display(f"Running {script_name}...", 'INFO')
-        subprocess.run(["python", script_name], check=True)
-        pretty_display(f"{script_name} completed successfully!", 'WARNING')
-    except subprocess.CalledProcessError as e:
-        pretty_display(f"Error running {script_name}: {e}" , 'ERROR')
+        pretty_display(f"Running {stage_name}...", 'INFO')
+        stage(*args)
+        ok = True
+        pretty_display(f"{stage_name} completed successfully!", 'WARNING')
+    except Exception as e:
+        pretty_display(f"Error running {stage_name}: {e}", 'ERROR')
+    seconds = time.perf_counter() - started
+    metrics.record(f"stage:{stage_name}", seconds, ok=ok)
+    return seconds
+
+def report_cycle_metrics(**extra):
+    """Export this cycle's metrics (see metrics.py) and print where the time went."""
+    summary = metrics.finish_cycle(**extra)
+    # main.pretty_display prints a single line, so print the breakdown below it
+    pretty_display(f"Cycle metrics written to {metrics.METRICS_FILE_PATH}", 'INFO')
+    print(metrics.format_summary(summary))
 
 def main():
-    """Main function to run all scripts in sequence."""
+    """Main function to run all stages in sequence inside this process."""
+    if not _cycle_lock.acquire(blocking=False):
+        pretty_display("The previous cycle is still running, skipping this one.", 'WARNING')
+        return
+    try:
+        run_cycle()
+    finally:
+        _cycle_lock.release()
+
+def run_cycle():
+    """Run one cycle: the activity page and due posts, then generation and posting."""
     try:
         pretty_display("Starting the LinkedIn comment automation workflow...", 'INFO')
+        metrics.start_cycle()
+
+        # Startup overhead for this cycle: only non-zero when the browser has to be (re)started
+        setup_started = time.perf_counter()
+        # Unattended: a login that needs a CAPTCHA fails the cycle instead of waiting for input
+        shared_driver = session_manager.get_driver(USERNAME, PASSWORD, headless=True, interactive=False)
+        setup_seconds = time.perf_counter() - setup_started
+        if not shared_driver:
+            pretty_display("Failed to log in, skipping this cycle.", 'ERROR')
+            report_cycle_metrics(mode="login_failed")
+            return
+
+        if STREAMING:
+            run_stage("activity", fetch_comments.refresh_activity, shared_driver)
+            streaming_seconds = run_stage("streaming pipeline", pipeline.run_streaming_cycle,
+                                          shared_driver, pipeline.get_post_driver())
+            # Post anything the streaming poster could not, e.g. without a second browser
+            post_seconds = run_stage("post_responses", post_responses.main, shared_driver)
+            pretty_display(
+                f"Cycle timings: setup {setup_seconds:.2f}s, streaming {streaming_seconds:.2f}s, "
+                f"post {post_seconds:.2f}s", 'INFO'
+            )
+            report_cycle_metrics(mode="streaming")
+            pretty_display("Workflow completed successfully!", 'SUCCESS')
+            return
 
         # Step 1: Fetch comments and save data
-        run_script("fetch_comments.py")
+        fetch_seconds = run_stage("fetch_comments", fetch_comments.main, shared_driver)
 
         # Step 2: Generate AI responses and save them
-        run_script("generate_responses.py")
+        generate_seconds = run_stage("generate_responses", generate_responses.main)
 
         # Step 3: Post the AI responses to LinkedIn
-        run_script("post_responses.py")
+        post_seconds = run_stage("post_responses", post_responses.main, shared_driver)
 
+        pretty_display(
+            f"Cycle timings: setup {setup_seconds:.2f}s, fetch {fetch_seconds:.2f}s, "
+            f"generate {generate_seconds:.2f}s, post {post_seconds:.2f}s", 'INFO'
+        )
+        report_cycle_metrics(mode="sequential")
         pretty_display("Workflow completed successfully!", 'SUCCESS')
     except Exception as e:
         pretty_display(f"Error in main workflow: {e}", 'ERROR')
 
-# Schedule the main function to run every 1 hour
-schedule.every(2).minutes.do(main)
-
-# Keep the script running
+# Keep the script running: one cycle at a time, each started when the scheduler next
+# has a post or the activity page due (see scheduler.py)
 if __name__ == "__main__":
-    pretty_display("Scheduler started. Waiting for the next run...", 'INFO')
+    pretty_display(f"Stage modules imported once in {IMPORT_SECONDS:.2f}s.", 'INFO')
+    pretty_display("Scheduler started.", 'INFO')
     while True:
-        schedule.run_pending()
-        time.sleep(1)  # Sleep for 1 second to avoid high CPU usage
\ No newline at end of file
+        try:
+            main()
+            delay = scheduler.seconds_until_next_cycle()
+            pretty_display(f"Next cycle in {delay:.0f}s.", 'INFO')
+            time.sleep(delay)
+        except KeyboardInterrupt:
+            pipeline.close_post_driver()
+            fetch_comments.close_worker_drivers()
+            session_manager.close_driver()
+            break
\ No newline at end of file
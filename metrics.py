@@ -0,0 +1,159 @@
+"""
+Per-cycle timing and throughput metrics.
+
+Code paths record spans (a name, a duration, success, and numeric attributes such as
+token counts) into the current cycle. `finish_cycle` aggregates them per span name,
+appends the summary as one JSON line to METRICS_FILE_PATH and, when
+PROMETHEUS_FILE_PATH is set, rewrites a Prometheus text-format file (e.g. for the
+node_exporter textfile collector).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# One JSON object per cycle
+METRICS_FILE_PATH = "assets/metrics.jsonl"
+
+# Prometheus text-format snapshot of the latest cycle; None disables it
+PROMETHEUS_FILE_PATH = None
+PROMETHEUS_PREFIX = "linkedin_bot"
+
+_spans = []
+_lock = threading.Lock()
+_cycle_started = None
+
+
+def start_cycle():
+    """Drop the spans recorded so far and start timing a new cycle."""
+    global _cycle_started
+    with _lock:
+        _spans.clear()
+        _cycle_started = (datetime.now(), time.perf_counter())
+
+def record(name, seconds, ok=True, **attributes):
+    """
+    Record a finished span.
+
+    Parameters:
+    - name (str): Span name, e.g. "post_fetch" or "llm_call".
+    - seconds (float): Its duration.
+    - ok (bool): Whether it succeeded.
+    - attributes: Numbers are summed per span name in the cycle summary (e.g.
+      prompt_tokens); other values are ignored there.
+    """
+    with _lock:
+        _spans.append({"name": name, "seconds": seconds, "ok": ok, "attributes": attributes})
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time the enclosed block as a span. Yields the attribute dict so the block can add
+    counts it only knows at the end. The span fails if the block raises.
+    """
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield attributes
+        ok = True
+    finally:
+        record(name, time.perf_counter() - started, ok=ok, **attributes)
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else None
+
+def summarize():
+    """
+    Aggregate the current cycle's spans.
+
+    Returns:
+    - dict: Per span name: count, errors, total/p50/p95/max seconds, and the sums of
+      its numeric attributes.
+    """
+    with _lock:
+        spans = list(_spans)
+
+    by_name = {}
+    for entry in spans:
+        by_name.setdefault(entry["name"], []).append(entry)
+
+    stages = {}
+    for name, entries in by_name.items():
+        durations = sorted(entry["seconds"] for entry in entries)
+        stage = {
+            "count": len(entries),
+            "errors": sum(not entry["ok"] for entry in entries),
+            "total_seconds": round(sum(durations), 4),
+            "p50_seconds": round(_percentile(durations, 0.5), 4),
+            "p95_seconds": round(_percentile(durations, 0.95), 4),
+            "max_seconds": round(durations[-1], 4),
+        }
+        for entry in entries:
+            for key, value in entry["attributes"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage[key] = stage.get(key, 0) + value
+        stages[name] = stage
+    return stages
+
+def write_prometheus(summary, file_path):
+    """Write a cycle summary in the Prometheus text format, replacing the file atomically."""
+    lines = [
+        f"# HELP {PROMETHEUS_PREFIX}_cycle_seconds Wall time of the latest cycle.",
+        f"# TYPE {PROMETHEUS_PREFIX}_cycle_seconds gauge",
+        f"{PROMETHEUS_PREFIX}_cycle_seconds {summary['cycle_seconds']}",
+        f"{PROMETHEUS_PREFIX}_cycle_timestamp_seconds {summary['timestamp']}",
+    ]
+    metric_names = sorted({key for stage in summary["stages"].values() for key in stage})
+    for key in metric_names:
+        metric = f"{PROMETHEUS_PREFIX}_span_{key}"
+        lines.append(f"# TYPE {metric} gauge")
+        for name, stage in sorted(summary["stages"].items()):
+            if key in stage:
+                lines.append(f'{metric}{{span="{name}"}} {stage[key]}')
+
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+    os.replace(temp_path, file_path)
+
+def finish_cycle(**extra):
+    """
+    Summarize the current cycle and export it.
+
+    Parameters:
+    - extra: Additional top-level fields for the JSON line, e.g. the cycle mode.
+
+    Returns:
+    - dict: The summary that was written.
+    """
+    started_at, started = _cycle_started or (datetime.now(), time.perf_counter())
+    summary = {
+        "started": started_at.isoformat(timespec="seconds"),
+        "timestamp": round(time.time(), 3),
+        "cycle_seconds": round(time.perf_counter() - started, 4),
+        **extra,
+        "stages": summarize(),
+    }
+
+    try:
+        os.makedirs(os.path.dirname(METRICS_FILE_PATH) or ".", exist_ok=True)
+        with open(METRICS_FILE_PATH, "a", encoding="utf-8") as file:
+            file.write(json.dumps(summary) + "\n")
+        if PROMETHEUS_FILE_PATH:
+            write_prometheus(summary, PROMETHEUS_FILE_PATH)
+    except OSError as e:
+        print(f"Could not write cycle metrics: {e}")
+    return summary
+
+def format_summary(summary):
+    """One line per span: count, total and p95 seconds, errors."""
+    lines = [f"Cycle took {summary['cycle_seconds']:.1f}s"]
+    for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["total_seconds"]):
+        line = f"{name}: {stage['count']}x, {stage['total_seconds']:.2f}s total, p95 {stage['p95_seconds']:.2f}s"
+        if stage["errors"]:
+            line += f", {stage['errors']} errors"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,172 @@
+"""
+Streaming mode for the workflow.
+
+Fetch, generation and posting run at the same time and hand work to each other through
+bounded queues: each post's new comments are queued for the generation workers as soon
+as the post is parsed, and each generated reply is queued for the poster right away.
+Everything is stored as it happens, so anything left unposted is picked up by the
+regular posting stage.
+"""
+import queue
+import threading
+import time
+
+import storage
+import session_manager
+from ledger import reply_hash
+from fetch_comments import iter_post_details, pretty_display
+import generate_responses
+from generate_responses import (
+    select_new_comments, process_comments, generate_response, generate_batch_responses,
+    build_response_record, MAX_CONCURRENT_REQUESTS
+)
+from post_responses import reply_to_comment
+
+# Bounds on work waiting between stages (comment chunks, replies); a full queue makes
+# the stage before it wait
+COMMENT_QUEUE_SIZE = 50
+REPLY_QUEUE_SIZE = 50
+
+# Marks the end of the work in a queue
+_DONE = object()
+
+# Second browser used by the poster while the main browser keeps fetching
+_post_driver = None
+
+def get_post_driver():
+    """Return the poster's browser, starting it from the saved session if needed."""
+    global _post_driver
+    if _post_driver is not None and (not session_manager.has_session_cookie(_post_driver)
+                                     or session_manager.is_logged_out(_post_driver)):
+        try:
+            _post_driver.quit()
+        except Exception:
+            pass
+        _post_driver = None
+    if _post_driver is None:
+        try:
+            _post_driver = session_manager.create_worker_driver()
+        except Exception as e:
+            pretty_display(f"Error starting the posting browser: {e}", 'ERROR')
+    return _post_driver
+
+def close_post_driver():
+    """Quit the poster's browser, if any."""
+    global _post_driver
+    if _post_driver is not None:
+        try:
+            _post_driver.quit()
+        except Exception:
+            pass
+        _post_driver = None
+
+def run_streaming_cycle(fetch_driver, post_driver=None, generation_workers=None):
+    """
+    Run one fetch -> generate -> post cycle with the three stages overlapping.
+
+    Parameters:
+    - fetch_driver (WebDriver): Logged-in browser used for fetching.
+    - post_driver (WebDriver): Logged-in browser used for posting. When None, generated
+      replies are only stored and left for the regular posting stage.
+    - generation_workers (int): Number of concurrent LLM requests.
+
+    Returns:
+    - dict: Counters for the cycle and the seconds from a comment being parsed to the
+      first reply being posted.
+    """
+    generation_workers = generation_workers or MAX_CONCURRENT_REQUESTS
+    comment_queue = queue.Queue(maxsize=COMMENT_QUEUE_SIZE)
+    reply_queue = queue.Queue(maxsize=REPLY_QUEUE_SIZE)
+    stats = {"Posts": 0, "Comments": 0, "Responses": 0, "Replies": 0, "Retried": 0, "First Reply Seconds": None}
+    stats_lock = threading.Lock()
+
+    def count(name):
+        with stats_lock:
+            stats[name] += 1
+
+    def generation_worker():
+        while True:
+            item = comment_queue.get()
+            if item is _DONE:
+                break
+            chunk, parsed_at = item
+            try:
+                if generate_responses.BATCH_COMMENTS:
+                    responses = generate_batch_responses(chunk[0]["Post Content"], chunk)
+                else:
+                    responses = [generate_response(c["Post Content"], c["Comment Text"], c["Commenter Name"]) for c in chunk]
+                for comment, response in zip(chunk, responses):
+                    if not response:
+                        continue
+                    record = build_response_record(comment, response)
+                    storage.save_response(record)
+                    count("Responses")
+                    reply_queue.put((record, parsed_at))
+            except Exception as e:
+                pretty_display(f"Error generating streamed response: {e}", 'ERROR')
+
+    def poster():
+        while True:
+            item = reply_queue.get()
+            if item is _DONE:
+                break
+            if post_driver is None:
+                continue  # Stays pending in the store
+            record, parsed_at = item
+            try:
+                if reply_to_comment(post_driver, record["Post URL"], record["Comment Text"],
+                                    record["Commenter Name"], record["AI Response"],
+                                    comment_id=record["Comment ID"]):
+                    storage.mark_posted(record, reply_hash(record["AI Response"]))
+                    with stats_lock:
+                        stats["Replies"] += 1
+                        if stats["First Reply Seconds"] is None:
+                            stats["First Reply Seconds"] = time.perf_counter() - parsed_at
+            except Exception as e:
+                pretty_display(f"Error posting streamed reply: {e}", 'ERROR')
+
+    workers = [threading.Thread(target=generation_worker, daemon=True) for _ in range(generation_workers)]
+    poster_thread = threading.Thread(target=poster, daemon=True)
+    for thread in workers + [poster_thread]:
+        thread.start()
+
+    try:
+        # Producer: queue each post's new comments as soon as the post is parsed
+        for post in iter_post_details(fetch_driver):
+            count("Posts")
+            parsed_at = time.perf_counter()
+            # The post is stored before it is yielded, so its comments can be range-queried
+            new_comments = select_new_comments(post_urls=[post["Post URL"]])
+            with stats_lock:
+                stats["Comments"] += len(new_comments)
+            # One generation request per chunk: a whole post when batching, else one comment
+            size = generate_responses.MAX_COMMENTS_PER_REQUEST if generate_responses.BATCH_COMMENTS else 1
+            for start in range(0, len(new_comments), size):
+                comment_queue.put((new_comments[start:start + size], parsed_at))
+        fetched = True
+    except Exception as e:
+        fetched = False
+        pretty_display(f"Error in streaming fetch: {e}", 'ERROR')
+    finally:
+        for _ in workers:
+            comment_queue.put(_DONE)
+        for thread in workers:
+            thread.join()
+        reply_queue.put(_DONE)
+        poster_thread.join()
+
+    # Retry every comment in range that still has no response, including those on posts
+    # not fetched this cycle; the watermark only moves once none is left (see
+    # process_comments). The retried replies are posted by the regular posting stage.
+    if fetched:
+        stats["Retried"] = len(process_comments())
+
+    summary = (
+        f"Streaming cycle: {stats['Posts']} posts, {stats['Comments']} new comments, "
+        f"{stats['Responses']} responses, {stats['Replies']} replies posted, "
+        f"{stats['Retried']} earlier failures answered"
+    )
+    if stats["First Reply Seconds"] is not None:
+        summary += f"\nFirst reply posted {stats['First Reply Seconds']:.1f}s after its comment was parsed"
+    pretty_display(summary, 'INFO')
+    return stats
@@ -0,0 +1,104 @@
+"""
+Offline parser for LinkedIn post pages.
+
+Works on a single `driver.page_source` snapshot taken after the comments have been
+expanded, so the browser is only needed for navigation and expansion. The returned
+tree holds the raw (uncleaned) strings in the same shape as EXTRACT_COMMENTS_SCRIPT
+in fetch_comments.py; cleaning is left to the caller.
+"""
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def _text(root, cls, separator=" "):
+    """Return the stripped text of the first descendant with the class, or None."""
+    element = root.find(class_=cls) if root is not None else None
+    if element is None:
+        return None
+    return element.get_text(separator, strip=True)
+
+def _read_entity(element):
+    """Read one comment or reply article. Returns None if a required field is missing."""
+    info = element.find(class_="comments-comment-meta__info")
+    time_commented = _text(info, "comments-comment-meta__data")
+    text = _text(element, "comments-comment-item__main-content")
+    name = _text(element, "comments-comment-meta__description-title")
+    if text is None or name is None or time_commented is None:
+        return None
+    return {"id": element.get("data-id"), "text": text, "name": name, "time": time_commented, "replies": []}
+
+def parse_comment_tree(root):
+    """
+    Parse every comment and its replies below `root`.
+
+    Returns:
+    - dict: {"comments": [...], "errors": int}, where errors counts entries that
+      were skipped because a field was missing.
+    """
+    comments = []
+    seen_ids = set()
+    errors = 0
+
+    for element in root.find_all(class_="comments-comment-entity"):
+        data_id = element.get("data-id")
+        if data_id in seen_ids:
+            continue
+        seen_ids.add(data_id)
+
+        comment = _read_entity(element)
+        if comment is None:
+            errors += 1
+            continue
+
+        replies_list = element.find(class_="comments-replies-list")
+        if replies_list is not None:
+            for reply_element in replies_list.find_all(class_="comments-comment-entity--reply"):
+                reply_id = reply_element.get("data-id")
+                if reply_id in seen_ids:
+                    continue
+                seen_ids.add(reply_id)
+
+                reply = _read_entity(reply_element)
+                if reply is None:
+                    errors += 1
+                    continue
+                comment["replies"].append(reply)
+
+        comments.append(comment)
+
+    return {"comments": comments, "errors": errors}
+
+def parse_post_page(html):
+    """
+    Parse post content, author, time posted and the nested comments from a post page.
+
+    Parameters:
+    - html (str): The page source of a post page.
+
+    Returns:
+    - dict: {"content", "author", "time", "comments", "errors"}. Text fields are None
+      when the element is missing from the page.
+    """
+    # bs4 is imported on first use to keep importing this module cheap
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    # The actor title repeats the name in visually hidden spans; keep the first line
+    author = _text(soup, "update-components-actor__title", separator="\n")
+    if author:
+        author = author.split("\n")[0]
+
+    comment_section = soup.find(class_="comments-comments-list")
+    tree = parse_comment_tree(comment_section) if comment_section is not None else {"comments": [], "errors": 0}
+
+    return {
+        "content": _text(soup, "feed-shared-update-v2__description"),
+        "author": author,
+        "time": _text(soup, "update-components-actor__sub-description"),
+        "comments": tree["comments"],
+        "errors": tree["errors"]
+    }
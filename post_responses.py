@@ -1,26 +1,26 @@
-import json
-import time
-import os
-from bs4 import BeautifulSoup
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import NoSuchElementException
+from session_manager import get_driver, close_driver, is_logged_out
+from fetch_comments import load_all_comments
+from waits import human_pause, wait_for_dom_settle, wait_for_network_idle
+import storage
+import metrics
+import scheduler
+from ledger import reply_hash
+
+# A reply that failed to post this many times (e.g. its comment was deleted) is no
+# longer retried, so the posting stage stops reopening its post every cycle
+MAX_POST_ATTEMPTS = 3
+
+# The thread a comment or reply belongs to: its top-level comment article. A reply box
+# opens inside the thread it answers, and boxes opened for earlier replies in the same
+# visit stay on the page, so the box is looked up in this thread only.
+THREAD_XPATH = (
+    "./ancestor-or-self::article[contains(@class, 'comments-comment-entity')"
+    " and not(contains(@class, 'comments-comment-entity--reply'))][1]"
+)
 
 
-# Path to the JSON file containing saved responses
-RESPONSES_FILE_PATH = "assets/linkedin_responses.json"
-
-# LinkedIn login URL
-LOGIN_URL = "https://www.linkedin.com/login"
-
 def pretty_display(message, message_type="INFO"):
     """
     Print a message with a colored border based on the message type.
@@ -64,215 +64,249 @@ def pretty_display(message, message_type="INFO"):
     print(color + border + colors['RESET'])
     
 
-def load_json_data(file_path):
+def find_comment_by_id(driver, comment_id):
     """
-    Load JSON data from the file. If the file is not found in the specified path,
-    it checks the current working directory.
+    Find a comment or reply article directly by its `data-id`.
 
-    Parameters:
-    - file_path (str): The path to the JSON file.
+    Threads are only opened and expanded when the comment is not already on the page.
 
     Returns:
-    - dict or list: The loaded JSON data, or None if the file is not found or invalid.
+    - WebElement: The comment article, or None if it is not on the post.
     """
-    try:
-        # Check if the file exists in the specified path
-        if not os.path.isfile(file_path):
-            # If not, check the current working directory
-            file_name = os.path.basename(file_path)
-            current_dir_path = os.path.join(os.getcwd(), file_name)
-            if os.path.isfile(current_dir_path):
-                file_path = current_dir_path
-            else:
-                pretty_display(f"No New Comments to Reply so terminating this Process", 'WARNING')
-                return None
-
-        # Load the JSON file
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            return data
-
-    except json.JSONDecodeError as e:
-        pretty_display(f"Invalid JSON format in file: {file_path}. Error: {e}", 'SUCCESS')
-        return None
-    except Exception as e:
-        pretty_display(f"Error loading JSON file: {e}", 'ERROR')
-        return None
-
-def login_to_linkedin(username, password, headless=False):
-    """Log in to LinkedIn and return the WebDriver instance."""
-    service = Service(ChromeDriverManager().install())
-    chrome_options = Options()
-
-    # Optional headless mode
-    if headless:
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
+    escaped_id = comment_id.replace("\\", "\\\\").replace('"', '\\"')
+    selector = f'article[data-id="{escaped_id}"]'
+
+    comments = driver.find_elements(By.CSS_SELECTOR, selector)
+    if comments:
+        return comments[0]
+
+    # Open the comments list if the post page did not show it yet
+    if not driver.find_elements(By.CLASS_NAME, "comments-comments-list"):
+        comment_buttons = driver.find_elements(By.CSS_SELECTOR, 'button[aria-label="Comment"]')
+        if comment_buttons:
+            driver.execute_script("arguments[0].click();", comment_buttons[0])
+            wait_for_dom_settle(driver)
+        comments = driver.find_elements(By.CSS_SELECTOR, selector)
+        if comments:
+            return comments[0]
+
+    # Expand older comments and replies only as a last resort, stopping once it shows up
+    load_all_comments(driver, until=selector)
+    comments = driver.find_elements(By.CSS_SELECTOR, selector)
+    return comments[0] if comments else None
+
+def find_comment_by_text(driver, comment_text, commenter_name, scroll=True):
+    """
+    Find a comment by scanning every comment for the commenter name and text.
+    Used for records saved without a comment id.
 
-    driver = webdriver.Chrome(service=service)#, options=chrome_options)
-    driver.get(LOGIN_URL)
+    Parameters:
+    - scroll (bool): Scroll to the bottom first so lazily loaded comments are present.
+      Only needed once per page visit.
 
+    Returns:
+    - WebElement: The first matching comment article, or None.
+    """
+    # Selenium's wait helpers are slow to import, so they are loaded on first use
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    # Scroll to load all comments
+    last_height = driver.execute_script("return document.body.scrollHeight") if scroll else None
+    while scroll:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_for_dom_settle(driver, timeout=5)  # Wait for new comments to load
+        new_height = driver.execute_script("return document.body.scrollHeight")
+        if new_height == last_height:
+            break
+        last_height = new_height
+
+    # Find all comments
+    comments = driver.find_elements(By.XPATH, "//article[contains(@class, 'comments-comment-entity')]")
+
+    # Iterate through comments to find the matching one
+    for comment in comments:
+        try:
+            # Get the commenter name
+            commenter = WebDriverWait(comment, 10).until(
+                EC.presence_of_element_located((By.XPATH, ".//span[contains(@class, 'comments-comment-meta__description-title')]"))
+            ).text.strip()  # Use strip() to remove extra whitespace
+
+            # Get the comment text
+            comment_content = comment.find_element(By.XPATH, ".//span[contains(@class, 'comments-comment-item__main-content')]").text
+
+            # Check if the commenter name and comment text match
+            if commenter_name in commenter and comment_text in comment_content:
+                return comment
+        except NoSuchElementException as e:
+            pretty_display(f"Error finding comment elements: {e}", 'ERROR')
+            continue
+        except Exception as e:
+            pretty_display(f"Error processing comment: {e}", 'ERROR')
+            continue
+    return None
+
+def submit_reply(driver, comment, ai_response):
+    """Open the reply box under a comment, type the response and post it."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    # Scroll the comment into view
+    driver.execute_script("arguments[0].scrollIntoView(true);", comment)
+    human_pause()
+
+    # Click the "Reply" button
     try:
-        # Input username and password
-        username_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, 'username'))
+        reply_button = WebDriverWait(comment, 10).until(
+            EC.element_to_be_clickable((By.XPATH, ".//button[contains(@aria-label, 'Reply')]"))
         )
-        username_field.send_keys(username)
+        reply_button.click()
+    except NoSuchElementException:
+        pretty_display("Reply button not found. Trying alternative method...", 'WARNING')
+        # Alternative method: Use JavaScript to click the Reply button
+        reply_button = comment.find_element(By.XPATH, ".//button[contains(@aria-label, 'Reply')]")
+        driver.execute_script("arguments[0].click();", reply_button)
+
+    # Wait for the reply text box in this comment's thread to be interactable
+    thread = comment.find_element(By.XPATH, THREAD_XPATH)
+    reply_box = WebDriverWait(thread, 10).until(
+        EC.element_to_be_clickable((By.XPATH, ".//div[contains(@class, 'comments-comment-box--reply')]//div[@role='textbox']"))
+    )
+    reply_box.send_keys(ai_response)
+    human_pause()
+
+    # Click the "Reply" button of the same box to post the response
+    post_button = WebDriverWait(thread, 10).until(
+        EC.element_to_be_clickable((By.XPATH, ".//div[contains(@class, 'comments-comment-box--reply')]//button[contains(@class, 'comments-comment-box__submit-button--cr')]"))
+    )
+    post_button.click()
+    wait_for_network_idle(driver)  # Wait for the reply to be submitted
+
+def open_post(driver, post_url):
+    """Navigate to a post and wait until it has loaded."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    # Replies are never held back, but their page loads count against the polling budget
+    scheduler.budget.spend()
+    driver.get(post_url)
+
+    # Wait for the post to load
+    WebDriverWait(driver, 20).until(
+        EC.presence_of_element_located((By.CLASS_NAME, "feed-shared-update-v2"))
+    )
+    wait_for_network_idle(driver)
+
+def reply_on_post(driver, post_url, responses):
+    """
+    Submit every reply for one post during a single visit to it.
 
-        password_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, 'password'))
-        )
-        password_field.send_keys(password)
+    The post is loaded once; comments are looked up by `data-id` when the response has
+    a "Comment ID", falling back to matching the commenter name and text.
 
-        # Try to locate the "Remember me" checkbox
-        try:
-            remember_me_checkbox = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "rememberMeOptIn-checkbox"))
-            )
-            driver.execute_script("arguments[0].checked = false;", remember_me_checkbox)
-        except TimeoutException:
-            pretty_display("Remember me checkbox not found. Continuing...", 'INFO')
-
-        # Click login
-        login_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CLASS_NAME, "btn__primary--large"))
-        )
-        login_button.click()
+    Parameters:
+    - driver (WebDriver): A logged-in browser.
+    - post_url (str): The post all the responses belong to.
+    - responses (list): Response records for that post.
 
-        # Wait for CAPTCHA manual resolution
-        pretty_display("If CAPTCHA is present, please solve it manually.", 'WARNING')
-        input("Once logged in, press Enter to continue...")
+    Yields:
+    - dict: Each response right after its reply was submitted.
+    """
+    try:
+        with metrics.span("post_open"):
+            open_post(driver, post_url)
+    except Exception as e:
+        is_logged_out(driver)  # Log in again next cycle if the session has ended
+        pretty_display(f"Error opening post {post_url}: {e}", 'ERROR')
+        return
 
-        # Verify successful login
+    scrolled = False
+    for response in responses:
+        commenter_name = response["Commenter Name"]
+        comment_text = response["Comment Text"]
+        ai_response = response["AI Response"]
         try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "scaffold-layout"))
-            )
-            pretty_display("Login verified successfully!", 'SUCCESS')
-        except TimeoutException:
-            pretty_display("Login verification failed. Ensure you're on the homepage after CAPTCHA.", 'ERROR')
-            driver.quit()
-            return None
+            comment_id = response.get("Comment ID")
+            comment = find_comment_by_id(driver, comment_id) if comment_id else None
+            if comment is None:
+                comment = find_comment_by_text(driver, comment_text, commenter_name, scroll=not scrolled)
+                scrolled = True
+            if comment is None:
+                pretty_display(f"Comment from {commenter_name} not found on the post.", 'WARNING')
+                continue
 
-    except Exception as e:
-        pretty_display(f"Login process encountered an error: {e}", 'ERROR')
-        driver.quit()
-        return None
+            print(f"Found matching comment from {commenter_name}: {comment_text}")
+            with metrics.span("reply_post"):
+                submit_reply(driver, comment, ai_response)
+            print(f"Replied to the comment with: {ai_response}")
+        except Exception as e:
+            pretty_display(f"Error replying to comment: {e}", 'ERROR')
+            continue
+        yield response
 
-    return driver
+def reply_to_comment(driver, post_url, comment_text, commenter_name, ai_response, comment_id=None):
+    """
+    Reply to a single LinkedIn comment. Costs one page load; use reply_on_post to
+    answer several comments on the same post.
 
-def reply_to_comment(driver, post_url, comment_text, commenter_name, ai_response):
-#def reply_to_comment_with_xpath(driver, post_url, comment_text, commenter_name, ai_response):
-    """Reply to a LinkedIn comment using XPath."""
-    try:
-        # Navigate to the post URL
-        driver.get(post_url)
-        time.sleep(5)  # Wait for the post to load
-
-        # Scroll to load all comments
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Wait for new comments to load
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-
-        # Find all comments
-        comments = driver.find_elements(By.XPATH, "//article[contains(@class, 'comments-comment-entity')]")
-        if not comments:
-            pretty_display("No comments found on the post.", 'WARNING')
-            return
+    Returns:
+    - bool: True if the reply was submitted.
+    """
+    response = {
+        "Comment ID": comment_id,
+        "Comment Text": comment_text,
+        "Commenter Name": commenter_name,
+        "AI Response": ai_response
+    }
+    return any(True for _ in reply_on_post(driver, post_url, [response]))
 
-        # Iterate through comments to find the matching one
-        for comment in comments:
-            try:
-                # Get the commenter name
-                commenter = WebDriverWait(comment, 10).until(
-                    EC.presence_of_element_located((By.XPATH, ".//span[contains(@class, 'comments-comment-meta__description-title')]"))
-                ).text.strip()  # Use strip() to remove extra whitespace
-
-                # Get the comment text
-                comment_content = comment.find_element(By.XPATH, ".//span[contains(@class, 'comments-comment-item__main-content')]").text
-
-                # Check if the commenter name and comment text match
-                if commenter_name in commenter and comment_text in comment_content:
-                    print(f"Found matching comment from {commenter_name}: {comment_text}")
-
-                    # Scroll the comment into view
-                    driver.execute_script("arguments[0].scrollIntoView(true);", comment)
-                    time.sleep(2)
-
-                    # Click the "Reply" button
-                    try:
-                        reply_button = WebDriverWait(comment, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, ".//button[contains(@aria-label, 'Reply')]"))
-                        )
-                        reply_button.click()
-                        time.sleep(2)
-                    except NoSuchElementException:
-                        pretty_display("Reply button not found. Trying alternative method...", 'WARNING')
-                        # Alternative method: Use JavaScript to click the Reply button
-                        reply_button = comment.find_element(By.XPATH, ".//button[contains(@aria-label, 'Reply')]")
-                        driver.execute_script("arguments[0].click();", reply_button)
-                        time.sleep(2)
-
-                    # Wait for the reply text box to be interactable
-                    reply_box = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, ".//div[contains(@class, 'comments-comment-box--reply')]//div[@role='textbox']"))
-                    )
-                    reply_box.send_keys(ai_response)
-                    time.sleep(2)
-
-                    # Click the "Reply" button to post the response
-                    post_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, ".//button[contains(@class, 'comments-comment-box__submit-button--cr')]"))
-                    )
-                    post_button.click()
-                    time.sleep(3)
-
-                    print(f"Replied to the comment with: {ai_response}")
-                    break
-            except NoSuchElementException as e:
-                pretty_display(f"Error finding comment elements: {e}", 'ERROR')
-                continue
-            except Exception as e:
-                pretty_display(f"Error processing comment: {e}", 'ERROR')
-                continue
-    except Exception as e:
-        pretty_display(f"Error replying to comment: {e}", 'ERROR')
+def group_by_post(responses):
+    """Group response records by "Post URL", keeping the order posts first appear in."""
+    grouped = {}
+    for response in responses:
+        grouped.setdefault(response["Post URL"], []).append(response)
+    return grouped
 
 
-def main():
-    # Load the saved responses
-    responses = load_json_data(RESPONSES_FILE_PATH)
-    if not responses:
-        return
+def main(driver=None):
+    """
+    Post the saved AI responses.
 
-    username = "your_username"  # Replace with your credentials
-    password = "your_password"  # Replace with your credentials
+    Parameters:
+    - driver (WebDriver): An already logged-in driver to reuse. When omitted, a new
+      browser is started for this run and closed afterwards.
+    """
+    # Load the saved responses that have not been posted yet
+    pending = storage.load_pending_responses(MAX_POST_ATTEMPTS)
+    if not pending:
+        pretty_display("No New Comments to Reply so terminating this Process", 'WARNING')
+        return
 
-    driver = login_to_linkedin(username, password, headless=True)
+    owns_driver = driver is None
+    if owns_driver:
+        username = "your_username"  # Replace with your credentials
+        password = "your_password"  # Replace with your credentials
 
-    try:
         # Log in to LinkedIn
+        driver = get_driver(username, password, headless=True)
         if not driver:
             return
 
-        # Process each response and reply to the comment
-        for response in responses:
-            post_url = response["Post URL"]
-            commenter_name = response["Commenter Name"]
-            comment_text = response["Comment Text"]
-            ai_response = response["AI Response"]
-
-            pretty_display(f"Processing comment on post: {post_url}", 'INFO')
-            reply_to_comment(driver, post_url, comment_text, commenter_name, ai_response)
+    try:
+        # Visit each post once and submit all of its replies
+        for post_url, responses in group_by_post(pending).items():
+            pretty_display(f"Processing {len(responses)} comment(s) on post: {post_url}", 'INFO')
+            posted = []
+            for response in reply_on_post(driver, post_url, responses):
+                # Record each success right away so a crash never causes a double post
+                storage.mark_posted(response, reply_hash(response["AI Response"]))
+                posted.append(response)
+            # Failures after the session ended are not the replies' fault
+            if not is_logged_out(driver):
+                storage.record_post_failures(response for response in responses if response not in posted)
     finally:
-        # Close the browser
-        driver.quit()
+        # Close the browser only if this run started it
+        if owns_driver:
+            close_driver()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Adaptive polling schedule for posts.
+
+Each post is polled on its own interval, based on an estimate of how fast it gets
+comments. A post that got new comments is polled again around when the next one is
+expected. A quiet post backs off exponentially, up to MAX_POLL_INTERVAL. Posts
+published in the last FRESH_POST_AGE are polled at least every FRESH_POLL_INTERVAL.
+
+All page loads share a rolling PAGES_PER_HOUR budget. When more posts are due than
+the budget allows, the posts expected to have the most new comments go first, and the
+rest wait for the next cycle.
+"""
+import heapq
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import storage
+from timestamps import parse_relative_time, to_utc_iso, utc_now
+
+# Bounds on a post's polling interval
+MIN_POLL_INTERVAL = timedelta(minutes=2)
+MAX_POLL_INTERVAL = timedelta(hours=24)
+
+# Posts published less than FRESH_POST_AGE ago are polled at least this often
+FRESH_POST_AGE = timedelta(hours=24)
+FRESH_POLL_INTERVAL = timedelta(minutes=10)
+
+# A poll without new comments multiplies the post's interval by this
+BACKOFF_FACTOR = 2
+
+# A post is polled again when this many new comments are expected on it
+COMMENTS_PER_POLL = 1
+
+# Weight of the latest observation in a post's average comment rate
+RATE_SMOOTHING = 0.5
+
+# Page loads (activity page, posts and replies) allowed in any rolling hour
+PAGES_PER_HOUR = 120
+
+# The activity page, which shows new posts and card comment counts, is scraped at most
+# this often
+ACTIVITY_POLL_INTERVAL = timedelta(minutes=5)
+
+# Shortest pause between the end of one cycle and the start of the next
+MIN_CYCLE_GAP = timedelta(seconds=30)
+
+
+class PageBudget:
+    """Rolling one-hour count of page loads, shared by every stage."""
+
+    def __init__(self, pages_per_hour=PAGES_PER_HOUR):
+        self.pages_per_hour = pages_per_hour
+        self._loads = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._loads and now - self._loads[0] >= 3600:
+            self._loads.popleft()
+
+    def available(self):
+        """Page loads left in the current hour."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return max(0, self.pages_per_hour - len(self._loads))
+
+    def take(self, pages):
+        """
+        Reserve up to `pages` page loads.
+
+        Returns:
+        - int: The number granted, which is less than asked once the budget runs out.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            granted = max(0, min(pages, self.pages_per_hour - len(self._loads)))
+            self._loads.extend([now] * granted)
+            return granted
+
+    def spend(self, pages=1):
+        """Count page loads that happen regardless of the budget, such as posting replies."""
+        with self._lock:
+            self._loads.extend([time.monotonic()] * pages)
+
+    def seconds_until_available(self):
+        """Seconds until at least one page load is available again."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._loads) < self.pages_per_hour:
+                return 0.0
+            return self._loads[len(self._loads) - self.pages_per_hour] + 3600 - now
+
+
+budget = PageBudget()
+
+
+def _parse(timestamp):
+    """Parse a stored UTC ISO time (see storage.now) as an aware datetime."""
+    return datetime.fromisoformat(timestamp).astimezone(timezone.utc) if timestamp else None
+
+def expected_new_comments(post, now):
+    """Comments expected on a post since it was last fetched, from its average rate."""
+    last_checked = _parse(post["last_checked"])
+    if last_checked is None:
+        return float("inf")
+    return (post["comment_rate"] or 0.0) * (now - last_checked).total_seconds() / 3600
+
+def select_due_posts(posts, limit, now=None):
+    """
+    Pick the due posts to fetch this cycle, most promising first.
+
+    Posts never fetched come first, then posts whose activity card shows a comment
+    count other than the one fetched last, then posts past their next poll time, ranked
+    by their expected number of new comments.
+
+    Parameters:
+    - posts (list): Due post rows from storage.load_due_posts.
+    - limit (int): The most posts to pick, e.g. the remaining page budget.
+
+    Returns:
+    - list: The chosen rows.
+    """
+    now = now or utc_now()
+
+    def priority(post):
+        if post["last_checked"] is None:
+            return (0, 0.0)
+        if post["card_is_fresh"] and post["card_comment_count"] != post["fetched_comment_count"]:
+            return (1, -abs((post["card_comment_count"] or 0) - (post["fetched_comment_count"] or 0)))
+        return (2, -expected_new_comments(post, now))
+
+    return heapq.nsmallest(limit, posts, key=priority)
+
+def next_poll(post, new_comments, now=None):
+    """
+    Update a post's comment rate and polling interval after a fetch.
+
+    Parameters:
+    - post (dict): The post's row from before the fetch (see storage.load_due_posts).
+    - new_comments (int): Comments and replies the fetch found that were not stored yet.
+
+    Returns:
+    - tuple: (comments per hour, interval in seconds, next poll time as a UTC ISO string).
+    """
+    now = now or utc_now()
+    last_checked = _parse(post["last_checked"])
+    posted_at = _parse(post["posted_at"])
+
+    # Observed rate since the last fetch; on the first fetch, over the post's lifetime
+    since = last_checked or posted_at
+    if since is not None:
+        hours = max((now - since).total_seconds() / 3600, MIN_POLL_INTERVAL.total_seconds() / 3600)
+        observed = new_comments / hours
+        rate = observed if post["comment_rate"] is None else (
+            RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * post["comment_rate"]
+        )
+    else:
+        rate = post["comment_rate"] or 0.0
+
+    min_seconds = MIN_POLL_INTERVAL.total_seconds()
+    max_seconds = MAX_POLL_INTERVAL.total_seconds()
+    if new_comments:
+        interval = COMMENTS_PER_POLL / rate * 3600 if rate else min_seconds
+    else:
+        interval = (post["poll_interval"] or min_seconds) * BACKOFF_FACTOR
+        if rate:
+            interval = max(interval, COMMENTS_PER_POLL / rate * 3600)
+    interval = min(max(interval, min_seconds), max_seconds)
+
+    if posted_at is not None and now - posted_at < FRESH_POST_AGE:
+        interval = min(interval, FRESH_POLL_INTERVAL.total_seconds())
+
+    return rate, interval, to_utc_iso(now + timedelta(seconds=interval))
+
+def record_poll(post, new_comments, time_posted=None, now=None):
+    """
+    Store a post's new rate and next poll time after a successful fetch.
+
+    Parameters:
+    - post (dict): The post's row from before the fetch.
+    - new_comments (int): Comments and replies the fetch found that were not stored yet.
+    - time_posted (str): The post's relative time label, e.g. "5d", used for its age on
+      the first fetch.
+    """
+    now = now or utc_now()
+    if post["posted_at"] is None and time_posted:
+        posted_at = parse_relative_time(time_posted, now)
+        post = dict(post, posted_at=to_utc_iso(posted_at) if posted_at else None)
+    rate, interval, next_poll_at = next_poll(post, new_comments, now)
+    storage.save_poll_schedule(post["urn"], post["posted_at"], rate, interval, next_poll_at)
+    return next_poll_at
+
+def activity_scrape_due(now=None):
+    """Whether the activity page is due for another scrape (ACTIVITY_POLL_INTERVAL)."""
+    scraped_at = _parse(storage.get_state("activity_scraped_at"))
+    return scraped_at is None or (now or utc_now()) - scraped_at >= ACTIVITY_POLL_INTERVAL
+
+def seconds_until_next_cycle(now=None):
+    """
+    Seconds to wait before the next cycle: until the earliest post poll or activity
+    scrape is due, but at least MIN_CYCLE_GAP, and until the page budget has room again.
+    """
+    now = now or utc_now()
+    scraped_at = _parse(storage.get_state("activity_scraped_at"))
+    due = [now if scraped_at is None else scraped_at + ACTIVITY_POLL_INTERVAL]
+    next_poll_at, pending = storage.earliest_next_poll()
+    if next_poll_at is not None:
+        due.append(_parse(next_poll_at))
+    if pending:
+        due.append(now)  # Left over when the page budget ran out
+
+    seconds = max((min(due) - now).total_seconds(), MIN_CYCLE_GAP.total_seconds())
+    return max(seconds, budget.seconds_until_available())
@@ -0,0 +1,409 @@
+import os
+import json
+import time
+import threading
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, SessionNotCreatedException
+import metrics
+
+# LinkedIn URLs
+LOGIN_URL = "https://www.linkedin.com/login"
+FEED_URL = "https://www.linkedin.com/feed/"
+# Lightweight page on the LinkedIn domain, needed before cookies can be added
+COOKIE_DOMAIN_URL = "https://www.linkedin.com/robots.txt"
+
+# Saved session cookies and Chrome profile, reused across runs
+COOKIES_FILE_PATH = "assets/linkedin_cookies.json"
+CHROME_PROFILE_DIR = "assets/chrome_profile"
+
+# LinkedIn's authentication cookie; the session is gone once it is missing or expired
+SESSION_COOKIE_NAME = "li_at"
+
+# Parts of the URLs LinkedIn redirects to once a session has ended on its side. The
+# li_at cookie can outlive such a session, so the cookie alone does not prove a login.
+LOGGED_OUT_URL_MARKERS = ("login", "authwall", "checkpoint")
+
+# Seconds to wait for the homepage after submitting the login form
+LOGIN_TIMEOUT = 30
+
+# chromedriver path resolved by webdriver-manager, reused so later starts skip its
+# version lookup. Resolved again when older than the max age or when Chrome rejects it.
+CHROMEDRIVER_CACHE_FILE_PATH = "assets/chromedriver_path.json"
+CHROMEDRIVER_CACHE_MAX_AGE = 7 * 24 * 3600
+_chromedriver_lock = threading.Lock()
+
+# Lean browsing profile for headless runs: no images, media, fonts or trackers and no
+# background work, so pages load faster and Chrome needs less memory. Visible windows
+# (the first login, CAPTCHA help) always get the full profile.
+LEAN_PROFILE = True
+
+# V8 heap limit for the renderer in the lean profile, in MB
+RENDERER_HEAP_MB = 512
+
+LEAN_CHROME_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--renderer-process-limit=2",
+    f"--js-flags=--max-old-space-size={RENDERER_HEAP_MB}",
+]
+
+# Requests blocked through CDP in the lean profile (Network.setBlockedURLs wildcards)
+BLOCKED_URL_PATTERNS = [
+    # Images, video and fonts
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+    "*.woff*", "*.ttf*", "*.otf*",
+    "*media.licdn.com/dms/image*", "*dms.licdn.com/playlist*",
+    # Analytics and ad trackers
+    "*px.ads.linkedin.com*", "*linkedin.com/li/track*", "*snap.licdn.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+
+# Driver shared by every stage running in this process
+_driver = None
+
+# Set when a stage lands on a login wall (see is_logged_out)
+_session_suspect = False
+
+def pretty_display(message, message_type="INFO"):
+    """Print a bordered message with fetch_comments.pretty_display."""
+    # Imported on use: fetch_comments imports this module
+    from fetch_comments import pretty_display as display
+    display(message, message_type)
+
+def resolve_chromedriver(refresh=False):
+    """
+    Return the chromedriver path, asking webdriver-manager only when there is no fresh
+    cached path (or `refresh` is set).
+    """
+    with _chromedriver_lock:
+        if not refresh:
+            try:
+                with open(CHROMEDRIVER_CACHE_FILE_PATH, "r", encoding="utf-8") as file:
+                    cached = json.load(file)
+                if os.path.isfile(cached["path"]) and time.time() - cached["resolved_at"] < CHROMEDRIVER_CACHE_MAX_AGE:
+                    return cached["path"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+        try:
+            os.makedirs(os.path.dirname(CHROMEDRIVER_CACHE_FILE_PATH) or ".", exist_ok=True)
+            with open(CHROMEDRIVER_CACHE_FILE_PATH, "w", encoding="utf-8") as file:
+                json.dump({"path": path, "resolved_at": time.time()}, file)
+        except OSError as e:
+            pretty_display(f"Error caching the chromedriver path: {e}", 'ERROR')
+        return path
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Block requests matching `patterns` in the driver's page through CDP."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        pretty_display(f"Could not enable resource blocking: {e}", 'WARNING')
+
+def create_driver(headless=False, profile_dir=CHROME_PROFILE_DIR, lean=None):
+    """
+    Start a Chrome instance.
+
+    Parameters:
+    - headless (bool): Run without a visible window.
+    - profile_dir (str): Chrome user-data directory to keep the session in, or None
+      for a throwaway profile.
+    - lean (bool): Use the lean browsing profile (LEAN_CHROME_ARGUMENTS and
+      BLOCKED_URL_PATTERNS). Defaults to LEAN_PROFILE for headless browsers.
+    """
+    if lean is None:
+        lean = LEAN_PROFILE and headless
+
+    # Selenium's Chrome classes are slow to import, so they are loaded on first use
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    chrome_options = Options()
+
+    # Expose CDP Network events through the performance log for waits.wait_for_network_idle
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+
+    # Optional headless mode; "new" is the full browser without a window
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+
+    if lean:
+        for argument in LEAN_CHROME_ARGUMENTS:
+            chrome_options.add_argument(argument)
+
+    try:
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=chrome_options)
+    except SessionNotCreatedException:
+        # Usually a cached driver that no longer matches an updated Chrome
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver(refresh=True)), options=chrome_options)
+
+    if lean:
+        block_resources(driver)
+    return driver
+
+def save_cookies(driver, file_path=COOKIES_FILE_PATH):
+    """Save the current browser cookies so later runs can skip the login form."""
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(driver.get_cookies(), file, indent=4)
+    except Exception as e:
+        pretty_display(f"Error saving session cookies: {e}", 'ERROR')
+
+def restore_cookies(driver, file_path=COOKIES_FILE_PATH):
+    """
+    Load saved cookies into the browser.
+
+    Returns:
+    - bool: True if a saved session cookie was restored.
+    """
+    if not os.path.isfile(file_path):
+        return False
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            cookies = json.load(file)
+
+        # Cookies can only be set for the domain that is currently open
+        driver.get(COOKIE_DOMAIN_URL)
+        for cookie in cookies:
+            cookie.pop("sameSite", None)  # Rejected by some chromedriver versions
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                continue
+        return has_session_cookie(driver)
+    except Exception as e:
+        pretty_display(f"Error restoring session cookies: {e}", 'ERROR')
+        return False
+
+def has_session_cookie(driver):
+    """Cheap session check: the auth cookie is present and not expired. No page load."""
+    try:
+        for cookie in driver.get_cookies():
+            if cookie.get("name") == SESSION_COOKIE_NAME:
+                expiry = cookie.get("expiry")
+                return expiry is None or expiry > time.time()
+    except Exception:
+        pass
+    return False
+
+def is_logged_out(driver):
+    """
+    Whether the browser was redirected to a login wall (LOGGED_OUT_URL_MARKERS). Stages
+    call this when a page fails to load; the next get_driver then verifies the session
+    with a page load and logs in again if it has ended.
+    """
+    global _session_suspect
+    try:
+        logged_out = any(marker in driver.current_url for marker in LOGGED_OUT_URL_MARKERS)
+    except Exception:
+        return False
+    if logged_out:
+        _session_suspect = True
+    return logged_out
+
+def is_session_valid(driver, verify=False):
+    """
+    Check whether the browser is still logged in.
+
+    Parameters:
+    - driver (WebDriver): The browser to check.
+    - verify (bool): Also load the feed and make sure LinkedIn does not redirect to a
+      login wall. Costs one page load, so it is only done for freshly started browsers.
+    """
+    if not has_session_cookie(driver):
+        return False
+    if not verify:
+        return True
+
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    try:
+        driver.get(FEED_URL)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "scaffold-layout"))
+        )
+        return not is_logged_out(driver)
+    except TimeoutException:
+        return False
+    except Exception as e:
+        pretty_display(f"Error verifying session: {e}", 'ERROR')
+        return False
+
+def login_to_linkedin(username, password, headless=False, driver=None, interactive=True):
+    """
+    Log in to LinkedIn with the login form and return the WebDriver instance.
+
+    Parameters:
+    - username (str): LinkedIn username.
+    - password (str): LinkedIn password.
+    - headless (bool): Run without a visible window when a new browser is started.
+    - driver (WebDriver): Browser to log in with. A new one is started when omitted.
+    - interactive (bool): Ask on the console for CAPTCHA help if the homepage does not
+      appear on its own. Disable for unattended runs. Never done for a new headless
+      browser, as nobody could see the CAPTCHA.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    if driver is None:
+        driver = create_driver(headless=headless)
+        interactive = interactive and not headless
+    driver.get(LOGIN_URL)
+
+    try:
+        # Input username and password
+        username_field = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.ID, 'username'))
+        )
+        username_field.send_keys(username)
+
+        password_field = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.ID, 'password'))
+        )
+        password_field.send_keys(password)
+
+        # Try to locate the "Remember me" checkbox; keep it ticked so the saved session lasts
+        try:
+            remember_me_checkbox = WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.ID, "rememberMeOptIn-checkbox"))
+            )
+            driver.execute_script("arguments[0].checked = true;", remember_me_checkbox)
+        except TimeoutException:
+            pretty_display("Remember me checkbox not found. Continuing...", 'WARNING')
+
+        # Click login
+        login_button = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.CLASS_NAME, "btn__primary--large"))
+        )
+        login_button.click()
+
+        # Verify successful login, falling back to manual CAPTCHA resolution
+        try:
+            WebDriverWait(driver, LOGIN_TIMEOUT).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "scaffold-layout"))
+            )
+        except TimeoutException:
+            if not interactive:
+                pretty_display("Login verification failed. A CAPTCHA may need to be solved manually.", 'ERROR')
+                driver.quit()
+                return None
+
+            pretty_display("If CAPTCHA is present, please solve it manually.", 'WARNING')
+            input("Once logged in, press Enter to continue...")
+            try:
+                WebDriverWait(driver, 20).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "scaffold-layout"))
+                )
+            except TimeoutException:
+                pretty_display("Login verification failed. Ensure you're on the homepage after CAPTCHA.", 'ERROR')
+                driver.quit()
+                return None
+
+        pretty_display("Login verified successfully!", 'SUCCESS')
+        save_cookies(driver)
+
+    except Exception as e:
+        pretty_display(f"Login process encountered an error: {e}", 'ERROR')
+        driver.quit()
+        return None
+
+    return driver
+
+def get_driver(username, password, headless=False, interactive=True):
+    """
+    Return a logged-in driver, reusing the saved session whenever it is still valid.
+
+    The same driver is returned to every caller in this process. A full form login is
+    only done when neither the Chrome profile nor the saved cookies hold a valid session.
+
+    Parameters:
+    - interactive (bool): Allow asking on the console for CAPTCHA help during a form
+      login. Only done when the browser has a visible window.
+    """
+    global _driver, _session_suspect
+
+    # Reuse the running browser if it is alive and still logged in; after a stage hit a
+    # login wall, only if the session passes the full check
+    if _driver is not None:
+        try:
+            if is_session_valid(_driver, verify=_session_suspect):
+                _session_suspect = False
+                return _driver
+        except Exception:
+            pass
+        close_driver()
+
+    _session_suspect = False
+    started = time.perf_counter()
+    has_saved_session = os.path.isfile(COOKIES_FILE_PATH)
+    try:
+        # The first login may need a visible window for CAPTCHA, later ones can run headless
+        headless_started = headless and has_saved_session
+        driver = create_driver(headless=headless_started)
+    except Exception as e:
+        pretty_display(f"Error starting the browser: {e}", 'ERROR')
+        metrics.record("login", time.perf_counter() - started, ok=False)
+        return None
+
+    # The Chrome profile usually still holds the session; fall back to the cookie file
+    driver.get(COOKIE_DOMAIN_URL)
+    if has_session_cookie(driver) or restore_cookies(driver):
+        if is_session_valid(driver, verify=True):
+            pretty_display("Restored saved LinkedIn session.", 'SUCCESS')
+            _driver = driver
+            metrics.record("login", time.perf_counter() - started, restored=1)
+            return _driver
+
+    pretty_display("Saved session missing or expired. Logging in...", 'WARNING')
+    # A CAPTCHA can only be solved by hand in a visible window
+    _driver = login_to_linkedin(username, password, driver=driver, interactive=interactive and not headless_started)
+    metrics.record("login", time.perf_counter() - started, ok=_driver is not None, restored=0)
+    return _driver
+
+def create_worker_driver(headless=True):
+    """
+    Start an extra browser that shares the saved session, for parallel workers.
+
+    Chrome cannot open one profile directory from two running instances, so workers use
+    a throwaway profile and get the session from the saved cookie file instead.
+
+    Returns:
+    - WebDriver: A logged-in driver, or None if no valid saved session is available.
+    """
+    driver = create_driver(headless=headless, profile_dir=None)
+    if restore_cookies(driver):
+        return driver
+
+    pretty_display("No saved session for worker browser. Log in with get_driver first.", 'ERROR')
+    driver.quit()
+    return None
+
+def close_driver():
+    """Quit the shared driver, if any."""
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except Exception:
+            pass
+        _driver = None
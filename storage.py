@@ -0,0 +1,412 @@
+import os
+import sqlite3
+import threading
+from ledger import comment_key
+from timestamps import to_utc_iso, utc_now
+
+# Single embedded store shared by the fetch, generate and post stages
+DB_FILE_PATH = "assets/linkedin.db"
+
+# Post author name, shared by the stages: the author's own comments and replies are
+# neither answered nor counted as new comments
+POST_AUTHOR = "Siddharamayya Mathapati"  #Change to your Linked in Name
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    urn TEXT PRIMARY KEY,
+    url TEXT,
+    author TEXT,
+    time_posted TEXT,
+    content TEXT,
+    feed_position INTEGER,
+    card_comment_count INTEGER,
+    fetched_comment_count INTEGER,
+    last_seen TEXT,
+    last_checked TEXT,
+    posted_at TEXT,
+    comment_rate REAL,
+    poll_interval REAL,
+    next_poll_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_last_seen ON posts (last_seen, feed_position);
+CREATE INDEX IF NOT EXISTS idx_posts_last_checked ON posts (last_checked);
+CREATE INDEX IF NOT EXISTS idx_posts_next_poll_at ON posts (next_poll_at);
+
+CREATE TABLE IF NOT EXISTS comments (
+    comment_key TEXT PRIMARY KEY,
+    post_urn TEXT NOT NULL,
+    parent_key TEXT,
+    position INTEGER,
+    comment_id TEXT,
+    commenter_name TEXT,
+    comment_text TEXT,
+    time_commented TEXT,
+    commented_at TEXT,
+    first_seen TEXT,
+    last_seen TEXT,
+    previous_check TEXT,
+    generation_attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_comments_post ON comments (post_urn, last_seen, position);
+CREATE INDEX IF NOT EXISTS idx_comments_commented_at ON comments (commented_at);
+CREATE INDEX IF NOT EXISTS idx_comments_first_seen ON comments (first_seen);
+
+CREATE TABLE IF NOT EXISTS responses (
+    comment_key TEXT PRIMARY KEY,
+    post_urn TEXT NOT NULL,
+    post_url TEXT,
+    post_content TEXT,
+    comment_id TEXT,
+    comment_text TEXT,
+    commenter_name TEXT,
+    time_commented TEXT,
+    ai_response TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    post_attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_generated_at ON responses (generated_at);
+
+CREATE TABLE IF NOT EXISTS postings (
+    comment_key TEXT PRIMARY KEY,
+    post_url TEXT,
+    comment_id TEXT,
+    reply_hash TEXT,
+    posted_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_connection = None
+_lock = threading.RLock()
+
+def now():
+    """Current time as a UTC ISO string (see timestamps.to_utc_iso); these sort correctly as text."""
+    return to_utc_iso(utc_now())
+
+def post_urn_from_url(post_url):
+    """Return the activity URN from a post URL."""
+    return post_url.rstrip("/").rsplit("/", 1)[-1]
+
+def get_connection(file_path=None):
+    """
+    Return the shared connection, creating the database and schema on first use.
+
+    The connection is shared by worker threads; writes go through `_lock`.
+    """
+    global _connection
+    with _lock:
+        if _connection is None:
+            file_path = file_path or DB_FILE_PATH
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            _connection = sqlite3.connect(file_path, check_same_thread=False)
+            _connection.row_factory = sqlite3.Row
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.executescript(SCHEMA)
+        return _connection
+
+def close_connection():
+    """Close the shared connection, if any."""
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+def get_state(name, default=None):
+    row = get_connection().execute("SELECT value FROM state WHERE name = ?", (name,)).fetchone()
+    return row["value"] if row else default
+
+def set_state(name, value):
+    connection = get_connection()
+    with _lock, connection:
+        connection.execute("INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)", (name, value))
+
+def save_activity(rows):
+    """
+    Record the posts found on the activity page.
+
+    Parameters:
+    - rows (list): (urn, comment count shown on the card) tuples in feed order.
+    """
+    seen_at = now()
+    connection = get_connection()
+    with _lock, connection:
+        connection.executemany(
+            """
+            INSERT INTO posts (urn, url, feed_position, card_comment_count, last_seen)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (urn) DO UPDATE SET
+                feed_position = excluded.feed_position,
+                card_comment_count = excluded.card_comment_count,
+                last_seen = excluded.last_seen
+            """,
+            [(urn, f"https://www.linkedin.com/feed/update/{urn}/", position, count, seen_at)
+             for position, (urn, count) in enumerate(rows)]
+        )
+        connection.execute("INSERT OR REPLACE INTO state (name, value) VALUES ('activity_scraped_at', ?)", (seen_at,))
+
+def known_post_urns():
+    """Return the URNs of every post recorded by an earlier activity scrape."""
+    return {row["urn"] for row in get_connection().execute("SELECT urn FROM posts")}
+
+def load_due_posts(now):
+    """
+    Return the posts the polling scheduler may fetch now (see scheduler.select_due_posts).
+
+    A post is due when it was never fetched, when its latest activity card shows a
+    comment count other than the one fetched last, or when its next poll time has passed
+    or was never set (posts fetched before polling was scheduled).
+
+    Parameters:
+    - now (str): Current UTC ISO timestamp.
+
+    Returns:
+    - list: Dicts with the post's urn, card and fetched comment counts, last_checked,
+      posted_at, comment_rate, poll_interval, next_poll_at and card_is_fresh (whether
+      the card count is from the latest activity scrape).
+    """
+    scraped_at = get_state("activity_scraped_at") or ""
+    rows = get_connection().execute(
+        """
+        SELECT urn, card_comment_count, fetched_comment_count, last_checked, posted_at, comment_rate,
+               poll_interval, next_poll_at, last_seen >= ? AS card_is_fresh
+        FROM posts
+        WHERE last_checked IS NULL
+           OR next_poll_at IS NULL
+           OR next_poll_at <= ?
+           OR (last_seen >= ? AND card_comment_count IS NOT fetched_comment_count)
+        ORDER BY feed_position
+        """,
+        (scraped_at, now, scraped_at)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+def earliest_next_poll():
+    """
+    Return (the earliest scheduled next poll time or None, the number of posts due as
+    soon as possible: never fetched, never scheduled, or with a changed card count).
+    """
+    connection = get_connection()
+    next_poll_at = connection.execute("SELECT MIN(next_poll_at) FROM posts").fetchone()[0]
+    scraped_at = get_state("activity_scraped_at") or ""
+    pending = connection.execute(
+        """
+        SELECT COUNT(*) FROM posts
+        WHERE last_checked IS NULL OR next_poll_at IS NULL
+           OR (last_seen >= ? AND card_comment_count IS NOT fetched_comment_count)
+        """,
+        (scraped_at,)
+    ).fetchone()[0]
+    return next_poll_at, pending
+
+def save_poll_schedule(urn, posted_at, comment_rate, poll_interval, next_poll_at):
+    """Store a post's estimated comment rate (per hour) and when to poll it next."""
+    connection = get_connection()
+    with _lock, connection:
+        connection.execute(
+            """
+            UPDATE posts SET posted_at = COALESCE(posted_at, ?), comment_rate = ?, poll_interval = ?, next_poll_at = ?
+            WHERE urn = ?
+            """,
+            (posted_at, comment_rate, poll_interval, next_poll_at, urn)
+        )
+
+def mark_fetch_started():
+    """Remember when the current fetch run started; generation reads what was fetched since."""
+    set_state("fetch_started_at", now())
+
+def save_post(urn, post, comment_count, author=None):
+    """
+    Store a fetched post with its comments and move its watermark.
+
+    Comments keep their `first_seen` time; `last_seen` marks them as present in this fetch.
+    Their absolute `commented_at` time is kept from the first fetch too, as the relative
+    labels it comes from get coarser with age ("20m" becomes "1d"). New comments record
+    the post's previous fetch time in `previous_check`: they were made after it.
+
+    Parameters:
+    - author (str): The post author's name; their own comments and replies are stored
+      but not counted as new.
+
+    Returns:
+    - int: The number of comments and replies that were not stored before.
+    """
+    fetched_at = now()
+    comment_rows = []
+    for position, comment in enumerate(post["Comments"]):
+        record = dict(comment, **{"Post URL": post["Post URL"]})
+        key = comment_key(record)
+        comment_rows.append((key, urn, None, position, comment))
+        for reply_position, reply in enumerate(comment.get("Replies", [])):
+            reply_record = dict(reply, **{"Post URL": post["Post URL"]})
+            comment_rows.append((comment_key(reply_record), urn, key, reply_position, reply))
+
+    connection = get_connection()
+    with _lock, connection:
+        stored = {row["comment_key"] for row in connection.execute(
+            "SELECT comment_key FROM comments WHERE post_urn = ?", (urn,)
+        )}
+        previous = connection.execute("SELECT last_checked FROM posts WHERE urn = ?", (urn,)).fetchone()
+        previous_check = previous["last_checked"] if previous else None
+        connection.execute(
+            """
+            INSERT INTO posts (urn, url, author, time_posted, content, fetched_comment_count, last_checked)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (urn) DO UPDATE SET
+                url = excluded.url,
+                author = excluded.author,
+                time_posted = excluded.time_posted,
+                content = excluded.content,
+                fetched_comment_count = excluded.fetched_comment_count,
+                last_checked = excluded.last_checked
+            """,
+            (urn, post["Post URL"], post["Author"], post["Time Posted"], post["Content"], comment_count, fetched_at)
+        )
+        connection.executemany(
+            """
+            INSERT INTO comments (comment_key, post_urn, parent_key, position, comment_id, commenter_name,
+                                  comment_text, time_commented, commented_at, first_seen, last_seen, previous_check)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (comment_key) DO UPDATE SET
+                parent_key = excluded.parent_key,
+                position = excluded.position,
+                comment_text = excluded.comment_text,
+                time_commented = excluded.time_commented,
+                commented_at = COALESCE(comments.commented_at, excluded.commented_at),
+                last_seen = excluded.last_seen
+            """,
+            [(key, post_urn, parent_key, position, comment.get("Comment ID"), comment["Commenter Name"],
+              comment["Comment Text"], comment["Time Commented"], comment.get("Commented At"), fetched_at, fetched_at,
+              previous_check)
+             for key, post_urn, parent_key, position, comment in comment_rows]
+        )
+    return len({key for key, _, _, _, comment in comment_rows if comment["Commenter Name"] != author} - stored)
+
+def load_comments_seen_since(since, post_urls=None):
+    """
+    Return the comments and replies first fetched at or after `since`, oldest first.
+
+    A range query on the `first_seen` index. A comment is in range for the fetch that
+    first stored it, whenever its post was fetched. Only comments present in their
+    post's latest fetch are included, so deleted comments drop out.
+
+    Parameters:
+    - since (str): UTC ISO timestamp (see now()).
+    - post_urls (list): Only return comments on these posts.
+
+    Returns:
+    - list: Flat records with "Post URL", "Post Content", "Comment ID", "Comment Text",
+      "Commenter Name", "Time Commented", "Commented At", "First Seen", "Previous Check"
+      and "Generation Attempts".
+    """
+    query = """
+        SELECT c.*, p.url, p.content FROM comments c
+        JOIN posts p ON p.urn = c.post_urn
+        WHERE c.first_seen >= ? AND c.last_seen >= p.last_checked
+    """
+    parameters = [since]
+    if post_urls is not None:
+        urns = [post_urn_from_url(url) for url in post_urls]
+        query += f" AND c.post_urn IN ({','.join('?' * len(urns))})"
+        parameters += urns
+    query += " ORDER BY c.commented_at, c.post_urn, c.parent_key IS NOT NULL, c.position"
+
+    return [{
+        "Post URL": row["url"],
+        "Post Content": row["content"],
+        "Comment ID": row["comment_id"],
+        "Comment Text": row["comment_text"],
+        "Commenter Name": row["commenter_name"],
+        "Time Commented": row["time_commented"],
+        "Commented At": row["commented_at"],
+        "First Seen": row["first_seen"],
+        "Previous Check": row["previous_check"],
+        "Generation Attempts": row["generation_attempts"]
+    } for row in get_connection().execute(query, parameters).fetchall()]
+
+def record_generation_failures(keys):
+    """Count one more failed response generation for each of these comment keys."""
+    keys = list(keys)
+    connection = get_connection()
+    with _lock, connection:
+        connection.executemany(
+            "UPDATE comments SET generation_attempts = generation_attempts + 1 WHERE comment_key = ?",
+            [(key,) for key in keys]
+        )
+
+def answered_keys(keys):
+    """Return the subset of comment keys that already have a generated response."""
+    keys = list(keys)
+    answered = set()
+    connection = get_connection()
+    for start in range(0, len(keys), 500):  # Stay below SQLite's bound-parameter limit
+        chunk = keys[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = connection.execute(
+            f"SELECT comment_key FROM responses WHERE comment_key IN ({placeholders})", chunk
+        ).fetchall()
+        answered.update(row["comment_key"] for row in rows)
+    return answered
+
+def save_response(response):
+    """Store a generated response (a linkedin_responses.json record)."""
+    connection = get_connection()
+    with _lock, connection:
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO responses (comment_key, post_urn, post_url, post_content, comment_id,
+                                              comment_text, commenter_name, time_commented, ai_response, generated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (comment_key(response), post_urn_from_url(response["Post URL"]), response["Post URL"],
+             response.get("Post Content"), response.get("Comment ID"), response["Comment Text"],
+             response["Commenter Name"], response.get("Time Commented"), response["AI Response"], now())
+        )
+
+def load_pending_responses(max_attempts=None):
+    """
+    Return generated responses that have not been posted yet, oldest first.
+
+    Parameters:
+    - max_attempts (int): Leave out responses whose posting already failed this many times.
+    """
+    rows = get_connection().execute(
+        """
+        SELECT r.* FROM responses r
+        LEFT JOIN postings p ON p.comment_key = r.comment_key
+        WHERE p.comment_key IS NULL AND (? IS NULL OR r.post_attempts < ?)
+        ORDER BY r.generated_at
+        """,
+        (max_attempts, max_attempts)
+    ).fetchall()
+    return [{
+        "Post URL": row["post_url"],
+        "Post Content": row["post_content"],
+        "Comment ID": row["comment_id"],
+        "Comment Text": row["comment_text"],
+        "Commenter Name": row["commenter_name"],
+        "Time Commented": row["time_commented"],
+        "AI Response": row["ai_response"]
+    } for row in rows]
+
+def record_post_failures(responses):
+    """Count one more failed attempt to post each of these responses."""
+    connection = get_connection()
+    with _lock, connection:
+        connection.executemany(
+            "UPDATE responses SET post_attempts = post_attempts + 1 WHERE comment_key = ?",
+            [(comment_key(response),) for response in responses]
+        )
+
+def mark_posted(response, reply_hash):
+    """Record that the reply to a response was posted successfully."""
+    connection = get_connection()
+    with _lock, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO postings (comment_key, post_url, comment_id, reply_hash, posted_at) VALUES (?, ?, ?, ?, ?)",
+            (comment_key(response), response["Post URL"], response.get("Comment ID"), reply_hash, now())
+        )
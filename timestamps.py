@@ -0,0 +1,70 @@
+"""
+Absolute times for LinkedIn's relative time labels.
+
+LinkedIn shows how long ago a comment was made ("now", "20m", "4h", "1w", "2mo",
+"1yr"). Those labels are only true at the moment they are read, so they are turned
+into absolute UTC timestamps at scrape time, with the fetch time as the reference.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+# Length of each label unit. Months and years are approximated; LinkedIn rounds those
+# labels down anyway.
+UNITS = {
+    "s": timedelta(seconds=1),
+    "m": timedelta(minutes=1),
+    "min": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+    "mo": timedelta(days=30),
+    "y": timedelta(days=365),
+    "yr": timedelta(days=365),
+}
+
+# A number and a unit at the start of the label, e.g. "20m" or "20m Edited"; longer
+# units first so "2mo" is not read as minutes
+RELATIVE_TIME = re.compile(r"^\s*(\d+)\s*(min|mo|yr|y|w|d|h|m|s)\b", re.IGNORECASE)
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+def to_utc_iso(moment):
+    """
+    Format a datetime as a UTC ISO string. These sort correctly as text, so they can be
+    range-queried in the store. Naive datetimes are taken as local time.
+    """
+    return moment.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+def parse_relative_time(label, reference):
+    """
+    Convert a relative time label into the absolute time it refers to.
+
+    Parameters:
+    - label (str): LinkedIn's label, e.g. "20m", "4d" or "now".
+    - reference (datetime): When the label was read (the fetch time).
+
+    Returns:
+    - datetime: `reference` minus the label's age, or None if the label is not understood.
+    """
+    if not label:
+        return None
+    if label.strip().lower() in ("now", "just now"):
+        return reference
+
+    match = RELATIVE_TIME.match(label)
+    if not match:
+        return None
+    return reference - int(match.group(1)) * UNITS[match.group(2).lower()]
+
+def format_relative_time(moment, reference):
+    """
+    Format the time between `moment` and `reference` the way LinkedIn labels it, e.g.
+    "now", "20m", "4h", "3d", "1w", "2mo" or "1yr" (rounded down, like LinkedIn).
+    """
+    age = max(reference - moment, timedelta(0))
+    for unit in ("yr", "mo", "w", "d", "h", "m"):
+        count = age // UNITS[unit]
+        if count:
+            return f"{count}{unit}"
+    return "now"
@@ -0,0 +1,142 @@
+"""
+Readiness-based waits for Selenium pages.
+
+Each wait returns as soon as the page is ready instead of sleeping for a fixed time.
+Human-like pauses are kept separate in `human_pause`, controlled by HUMAN_JITTER.
+"""
+import json
+import random
+import time
+
+# Extra random pause, in seconds, added between browser actions to look less robotic.
+# (0, 0) disables it; e.g. (1, 3) restores the old human-like pacing.
+HUMAN_JITTER = (0.0, 0.0)
+
+# Resolves once nothing under the root has changed for `quietMs`, or at the timeout
+DOM_SETTLE_SCRIPT = """
+const root = arguments[0] || document.body;
+const quietMs = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+let mutations = 0;
+let quietTimer = null;
+let hardTimer = null;
+let observer = null;
+const finish = (settled) => {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(hardTimer);
+    done({settled: settled, mutations: mutations, elapsed: Date.now() - started});
+};
+observer = new MutationObserver((records) => {
+    mutations += records.length;
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => finish(true), quietMs);
+});
+observer.observe(root, {childList: true, subtree: true, characterData: true});
+quietTimer = setTimeout(() => finish(true), quietMs);
+hardTimer = setTimeout(() => finish(false), timeoutMs);
+"""
+
+# Number of finished resource loads, used when CDP network events are not available
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length;"
+
+# Request types that stay open for the life of the page (streams and sockets); they
+# never finish, so they do not keep the network busy
+LONG_LIVED_REQUEST_TYPES = {"EventSource", "WebSocket"}
+
+# Called as listener(driver, events) with every batch of CDP Network events read from
+# the performance log. Reading the log drains it, so other code (e.g. comment_api)
+# sees the events the waits consume through these.
+network_event_listeners = []
+
+
+def human_pause(jitter=None):
+    """Sleep for a random time within the jitter range (HUMAN_JITTER by default)."""
+    low, high = jitter or HUMAN_JITTER
+    if high > 0:
+        time.sleep(random.uniform(low, high))
+
+def wait_for_dom_settle(driver, root=None, quiet=0.5, timeout=10):
+    """
+    Wait until the DOM below `root` (the whole body by default) stops changing.
+
+    Parameters:
+    - quiet (float): Seconds without any mutation that count as settled.
+    - timeout (float): Maximum seconds to wait.
+
+    Returns:
+    - dict: {"settled": bool, "mutations": int, "elapsed": milliseconds}
+    """
+    return driver.execute_async_script(DOM_SETTLE_SCRIPT, root, int(quiet * 1000), int(timeout * 1000))
+
+def read_network_events(driver):
+    """
+    Read pending CDP Network events from the performance log, or None if it is off.
+    The events are passed to every listener in `network_event_listeners` as well.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    for listener in network_event_listeners:
+        listener(driver, events)
+    return events
+
+def _track_requests(events, in_flight):
+    """Add requests started in `events` to the `in_flight` set and remove finished ones."""
+    for event in events:
+        params = event.get("params", {})
+        request_id = params.get("requestId")
+        if event["method"] == "Network.requestWillBeSent":
+            if params.get("type") not in LONG_LIVED_REQUEST_TYPES:
+                in_flight.add(request_id)
+        elif event["method"] in ("Network.loadingFinished", "Network.loadingFailed"):
+            in_flight.discard(request_id)
+
+def wait_for_network_idle(driver, idle=0.5, timeout=10, poll=0.1):
+    """
+    Wait until no network request has been in flight for `idle` seconds.
+
+    Uses CDP Network events from the performance log (enabled in
+    session_manager.create_driver). Without the log, falls back to waiting until the
+    page's resource-timing entry count stops growing.
+
+    Returns:
+    - bool: True if the network went idle before the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    in_flight = set()
+    idle_since = time.monotonic()
+    # Requests started before the wait and still loading count as in flight
+    events = read_network_events(driver)
+    use_cdp = events is not None
+    if use_cdp:
+        _track_requests(events, in_flight)
+    last_resources = None if use_cdp else driver.execute_script(RESOURCE_COUNT_SCRIPT)
+
+    while time.monotonic() < deadline:
+        time.sleep(poll)
+        if use_cdp:
+            _track_requests(read_network_events(driver) or [], in_flight)
+            busy = bool(in_flight)
+        else:
+            resources = driver.execute_script(RESOURCE_COUNT_SCRIPT)
+            busy = resources != last_resources
+            last_resources = resources
+
+        if busy:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= idle:
+            return True
+    return False